@@ -11,6 +11,17 @@ PyInstaller.__main__.run([
     '--add-data=resources;resources',
     '--add-data=about.py;.',
     '--add-data=print_dialog.py;.',
+    '--add-data=preview_cache.py;.',
+    '--add-data=workspace_scene.py;.',
+    '--add-data=redraw_scheduler.py;.',
+    '--add-data=preview_worker.py;.',
+    '--add-data=geometry.py;.',
+    '--add-data=image_loader.py;.',
+    '--add-data=disk_cache.py;.',
+    '--add-data=tiled_raster.py;.',
+    '--add-data=tile_renderer.py;.',
+    '--add-data=poster_engine.py;.',
+    '--add-data=pdf_images.py;.',
     '--hidden-import=PIL._tkinter_finder',
     '--hidden-import=win32timezone',
     '--clean',
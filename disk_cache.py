@@ -0,0 +1,180 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from PIL import Image
+
+
+class DiskCache:
+    """
+    Caché persistente en disco de pirámides de vista previa.
+    La clave es ruta absoluta + mtime + tamaño del archivo: si el archivo cambia,
+    la entrada deja de coincidir y termina desalojada por edad o por tamaño.
+    Cada entrada es <clave>.json (metadatos) + <clave>.<nivel>.raw (pixels sin comprimir,
+    se leen sin decodificar). El .json se escribe al final: es la marca de entrada completa.
+    """
+
+    # Cambiar si cambia el formato de las entradas (invalida lo guardado)
+    FORMAT_VERSION = 1
+
+    def __init__(self, directory=None, max_bytes=1024 * 1024 * 1024, max_age_days=30):
+        self.directory = directory or self.default_directory()
+        self.max_bytes = max_bytes
+        self.max_age = max_age_days * 24 * 3600
+        self.stats = {'hits': 0, 'misses': 0, 'stores': 0, 'evicted': 0, 'errors': 0}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def default_directory(name='preview_cache'):
+        """Carpeta de caché del usuario (LOCALAPPDATA en Windows, ~/.cache en otros)"""
+        base = os.environ.get('LOCALAPPDATA') or os.path.join(os.path.expanduser('~'), '.cache')
+        return os.path.join(base, 'PosterPrinter', name)
+
+    def make_key(self, path):
+        st = os.stat(path)
+        raw = f"{os.path.abspath(path)}|{st.st_mtime_ns}|{st.st_size}|v{self.FORMAT_VERSION}"
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+    def _meta_path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def data_path(self, key, index=0):
+        """Archivo de datos index de la entrada key (se escribe antes de commit)"""
+        return os.path.join(self.directory, f"{key}.{index}.raw")
+
+    def lookup(self, path):
+        """(clave, metadatos) de una entrada completa para el archivo, o None"""
+        try:
+            key = self.make_key(path)
+            meta_path = self._meta_path(key)
+            if not os.path.exists(meta_path):
+                self._count('misses')
+                return None
+
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+
+            # La edad se mide desde el último uso
+            os.utime(meta_path)
+            self._count('hits')
+            return key, meta
+        except (OSError, ValueError) as e:
+            print(f"Caché ilegible para {path}: {e}")
+            self._count('errors')
+            self._count('misses')
+            return None
+
+    def commit(self, key, meta):
+        """Escribir los metadatos (marca de entrada completa) y aplicar la política de desalojo"""
+        meta_path = self._meta_path(key)
+        with open(meta_path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        os.replace(meta_path + '.tmp', meta_path)
+        self._count('stores')
+        self.evict()
+
+    def load(self, path):
+        """
+        Metadatos y niveles guardados para el archivo, o None si no hay entrada válida.
+        Devuelve (meta, [Image, ...]) con el nivel 0 a resolución de vista previa.
+        """
+        entry = self.lookup(path)
+        if entry is None:
+            return None
+        key, meta = entry
+
+        try:
+            levels = []
+            for index, (width, height) in enumerate(meta['levels']):
+                with open(self.data_path(key, index), 'rb') as f:
+                    levels.append(Image.frombytes(meta['mode'], (width, height), f.read()))
+            return meta, levels
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Caché de vista previa ilegible para {path}: {e}")
+            self._count('errors')
+            return None
+
+    def store(self, path, meta, levels):
+        """Guardar niveles (misma mode) y metadatos; luego aplicar la política de desalojo"""
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            key = self.make_key(path)
+
+            for index, level in enumerate(levels):
+                level_path = self.data_path(key, index)
+                with open(level_path + '.tmp', 'wb') as f:
+                    f.write(level.tobytes())
+                os.replace(level_path + '.tmp', level_path)
+
+            self.commit(key, dict(meta, mode=levels[0].mode, levels=[level.size for level in levels]))
+        except (OSError, ValueError) as e:
+            print(f"No se pudo guardar la caché de vista previa: {e}")
+            self._count('errors')
+
+    def _scan(self):
+        """
+        Recorrer la carpeta: ([(último uso, bytes, clave)] de entradas completas,
+        {clave: mtime más reciente} de todas las claves con archivos)
+        """
+        used = {}
+        sizes = {}
+        touched = {}
+        for name in os.listdir(self.directory):
+            key = name.split('.', 1)[0]
+            try:
+                st = os.stat(os.path.join(self.directory, name))
+            except OSError:
+                continue
+            sizes[key] = sizes.get(key, 0) + st.st_size
+            touched[key] = max(touched.get(key, 0), st.st_mtime)
+            if name.endswith('.json'):
+                used[key] = st.st_mtime
+        return [(used[key], sizes[key], key) for key in used], touched
+
+    def evict(self):
+        """Desalojar entradas más viejas que max_age y luego las menos usadas hasta max_bytes"""
+        with self._lock:
+            try:
+                entries, touched = self._scan()
+            except OSError:
+                return
+            now = time.time()
+
+            # Archivos sin .json: escrituras interrumpidas (o aún en curso si son recientes)
+            complete = {key for _, _, key in entries}
+            for key, mtime in touched.items():
+                if key not in complete and now - mtime > 3600:
+                    self._remove(key)
+
+            entries.sort()
+            total = sum(nbytes for _, nbytes, _ in entries)
+            for used, nbytes, key in entries:
+                if now - used <= self.max_age and total <= self.max_bytes:
+                    break
+                self._remove(key)
+                self.stats['evicted'] += 1
+                total -= nbytes
+
+    def _remove(self, key):
+        prefix = key + '.'
+        for name in os.listdir(self.directory):
+            if name.startswith(prefix):
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except OSError:
+                    pass
+
+    def clear(self):
+        """Borrar todas las entradas"""
+        with self._lock:
+            if os.path.isdir(self.directory):
+                for name in os.listdir(self.directory):
+                    try:
+                        os.remove(os.path.join(self.directory, name))
+                    except OSError:
+                        pass
+
+    def _count(self, stat):
+        with self._lock:
+            self.stats[stat] += 1
@@ -0,0 +1,242 @@
+import math
+
+
+def _rotation_affine(width, height, angle):
+    """Matriz inversa y tamaño de Image.rotate(-angle, expand=True), igual que Pillow"""
+    rad = -math.radians(-angle % 360.0)
+    a = round(math.cos(rad), 15)
+    b = round(math.sin(rad), 15)
+    d = round(-math.sin(rad), 15)
+    e = a
+
+    cx, cy = width / 2, height / 2
+    c = a * -cx + b * -cy + cx
+    f = d * -cx + e * -cy + cy
+
+    xx = []
+    yy = []
+    for x, y in ((0, 0), (width, 0), (width, height), (0, height)):
+        xx.append(a * x + b * y + c)
+        yy.append(d * x + e * y + f)
+    new_w = math.ceil(max(xx)) - math.floor(min(xx))
+    new_h = math.ceil(max(yy)) - math.floor(min(yy))
+
+    # Compensación de expand: el centro de la imagen rotada cae en el centro de la fuente
+    tx, ty = -(new_w - width) / 2.0, -(new_h - height) / 2.0
+    c, f = a * tx + b * ty + c, d * tx + e * ty + f
+    return (a, b, c, d, e, f), (new_w, new_h)
+
+
+def rotated_size(width, height, angle):
+    """
+    Tamaño (px) que devolvería Image.rotate(-angle, expand=True), calculado
+    analíticamente con la misma matriz que usa Pillow (sin tocar pixels).
+    """
+    angle = -angle % 360.0
+    if angle in (0, 180):
+        return width, height
+    if angle in (90, 270):
+        return height, width
+    return _rotation_affine(width, height, -angle)[1]
+
+
+def rotation_matrix(width, height, angle):
+    """
+    Matriz afín (a, b, c, d, e, f) que lleva coordenadas de la imagen rotada
+    (Image.rotate(-angle, expand=True)) a coordenadas de la fuente, en la misma
+    convención que Image.transform(..., Image.AFFINE, matriz).
+    """
+    return _rotation_affine(width, height, angle)[0]
+
+
+class ImageTransform:
+    """
+    Modelo de transformación de la imagen: rotación, tamaño fuente y extensión rotada.
+    La geometría derivada se recalcula solo cuando cambian la fuente o la rotación,
+    así ningún camino (vista previa, exportación, impresión) rota pixels para medir.
+    """
+
+    def __init__(self):
+        self.source_size = None
+        self.angle = 0
+        self._rotated_size = None
+
+    def set_source_size(self, width, height):
+        if (width, height) != self.source_size:
+            self.source_size = (width, height)
+            self._rotated_size = None
+
+    def set_rotation(self, angle):
+        """Actualizar ángulo; devuelve True si cambió"""
+        if angle == self.angle:
+            return False
+        self.angle = angle
+        self._rotated_size = None
+        return True
+
+    @property
+    def rotated_size(self):
+        """Tamaño en px de la imagen fuente rotada (expand=True)"""
+        if self._rotated_size is None and self.source_size is not None:
+            self._rotated_size = rotated_size(self.source_size[0], self.source_size[1], self.angle)
+        return self._rotated_size
+
+    @property
+    def aspect_ratio(self):
+        """Alto / ancho de la imagen rotada"""
+        rot_w, rot_h = self.rotated_size
+        return rot_h / rot_w
+
+    def mm_per_px(self, width_mm):
+        """Escala: mm por pixel fuente (rotado) cuando la imagen mide width_mm de ancho"""
+        return width_mm / self.rotated_size[0]
+
+    def effective_dpi(self, width_mm):
+        """Resolución real de la fuente (px por pulgada) con la imagen a width_mm de ancho"""
+        return self.rotated_size[0] / (width_mm / 25.4)
+
+    def output_dpi(self, width_mm, max_dpi):
+        """DPI de salida: la resolución efectiva de la fuente con techo max_dpi (nunca se amplía)"""
+        return max(1, min(int(max_dpi), int(self.effective_dpi(width_mm))))
+
+    def target_size(self, width_mm, dpi):
+        """Tamaño en px de la imagen rotada impresa a width_mm de ancho y dpi dados"""
+        target_w = int((width_mm / 25.4) * dpi)
+        return target_w, int(target_w * self.aspect_ratio)
+
+
+def point_in_polygon(x, y, polygon):
+    """Ray casting: True si (x, y) cae dentro del polígono [(x, y), ...]"""
+    inside = False
+    j = len(polygon) - 1
+    for i in range(len(polygon)):
+        xi, yi = polygon[i]
+        xj, yj = polygon[j]
+        if (yi > y) != (yj > y) and x < (xj - xi) * (y - yi) / (yj - yi) + xi:
+            inside = not inside
+        j = i
+    return inside
+
+
+class HitTester:
+    """
+    Hit testing en mm del espacio de trabajo a partir del estado del modelo
+    (img_x, img_y, img_width, img_height, zoom), sin consultar al canvas de Tk.
+    Devuelve 'handle_<corner>', 'image' o None.
+    """
+
+    CORNERS = ('nw', 'ne', 'sw', 'se')
+
+    def __init__(self, handle_px=20):
+        # Lado de los handles de esquina en pixels de pantalla (se dibujan dentro del rectángulo)
+        self.handle_px = handle_px
+
+    def handle_boxes(self, x, y, width, height, zoom):
+        """Cajas (mm) de los handles de esquina, en el mismo orden que CORNERS"""
+        size = self.handle_px / zoom
+        right = x + width
+        bottom = y + height
+        return {
+            'nw': (x, y, x + size, y + size),
+            'ne': (right - size, y, right, y + size),
+            'sw': (x, bottom - size, x + size, bottom),
+            'se': (right - size, bottom - size, right, bottom),
+        }
+
+    def hit_test(self, px, py, rect, zoom, selected, outline=None):
+        """
+        rect: (x, y, ancho, alto) en mm del rectángulo de selección.
+        outline: polígono opcional (mm) para contornos rotados; si no, se usa rect.
+        """
+        if rect is None:
+            return None
+        x, y, width, height = rect
+
+        if selected:
+            for corner, (x1, y1, x2, y2) in self.handle_boxes(x, y, width, height, zoom).items():
+                if x1 <= px <= x2 and y1 <= py <= y2:
+                    return f'handle_{corner}'
+
+        if outline is not None:
+            inside = point_in_polygon(px, py, outline)
+        else:
+            inside = x <= px <= x + width and y <= py <= y + height
+        return 'image' if inside else None
+
+
+class TileLayout:
+    """
+    Distribución de hojas del póster: qué tiles (row, col) toca el rectángulo de
+    selección, su número de página y su rectángulo en mm. Se calcula una vez por
+    cambio de papel, solapado o posición/tamaño; key identifica esa configuración.
+    """
+
+    def __init__(self, paper_w, paper_h, overlap, selection=None):
+        """selection: (x, y, ancho, alto) en mm del rectángulo de selección, o None"""
+        self.paper_w = paper_w
+        self.paper_h = paper_h
+        self.overlap = overlap
+        self.selection = selection
+        self.key = self.make_key(paper_w, paper_h, overlap, selection)
+
+        self.effective_w = paper_w - overlap
+        self.effective_h = paper_h - overlap
+
+        self.pages = self._compute_pages()
+        self.page_numbers = {page: idx + 1 for idx, page in enumerate(self.pages)}
+
+        if self.pages:
+            self.min_row = min(p[0] for p in self.pages)
+            self.max_row = max(p[0] for p in self.pages)
+            self.min_col = min(p[1] for p in self.pages)
+            self.max_col = max(p[1] for p in self.pages)
+            self.rows = self.max_row - self.min_row + 1
+            self.cols = self.max_col - self.min_col + 1
+        else:
+            self.min_row = self.max_row = self.min_col = self.max_col = None
+            self.rows = self.cols = 0
+
+    @staticmethod
+    def make_key(paper_w, paper_h, overlap, selection):
+        return (paper_w, paper_h, overlap, tuple(selection) if selection is not None else None)
+
+    def _compute_pages(self):
+        """Tiles que intersectan el rectángulo de selección, en orden fila-columna"""
+        if self.selection is None:
+            return []
+
+        sel_x, sel_y, sel_w, sel_h = self.selection
+        selection_right = sel_x + sel_w
+        selection_bottom = sel_y + sel_h
+
+        # Rango de páginas que el rectángulo de selección toca
+        start_col = max(0, int(sel_x / self.effective_w))
+        start_row = max(0, int(sel_y / self.effective_h))
+        end_col = int(selection_right / self.effective_w) + 1
+        end_row = int(selection_bottom / self.effective_h) + 1
+
+        pages = []
+        for row in range(start_row, end_row):
+            for col in range(start_col, end_col):
+                page_left, page_top, page_right, page_bottom = self.tile_rect(row, col)
+                intersects = not (selection_right <= page_left or sel_x >= page_right or
+                                  selection_bottom <= page_top or sel_y >= page_bottom)
+                if intersects:
+                    pages.append((row, col))
+        return pages
+
+    def tile_rect(self, row, col):
+        """Rectángulo (left, top, right, bottom) en mm de la hoja (row, col)"""
+        left = col * self.effective_w
+        top = row * self.effective_h
+        return left, top, left + self.paper_w, top + self.paper_h
+
+    def page_number(self, row, col):
+        """Número de página (1..n) del tile, o None si no tiene imagen"""
+        return self.page_numbers.get((row, col))
+
+    def __len__(self):
+        return len(self.pages)
+
+    def __iter__(self):
+        return iter(self.pages)
@@ -0,0 +1,255 @@
+import os
+import queue
+import threading
+import traceback
+from PIL import Image
+from preview_cache import PreviewPyramid
+from tiled_raster import TiledRaster
+
+
+def normalize_mode(img):
+    """Convertir a RGB salvo que ya sea RGB/RGBA (mismo criterio en preview y full)"""
+    if img.mode not in ('RGB', 'RGBA'):
+        img = img.convert('RGB')
+    return img
+
+
+class SourceImage:
+    """
+    Imagen fuente cargada de forma perezosa.
+    Al abrir solo se lee el header; la vista previa se decodifica reducida
+    (escalado DCT de Image.draft en JPEG, bandas mapeadas en formatos sin comprimir).
+    Exportación e impresión leen solo las regiones que necesitan (read_region)
+    a través de TiledRaster, sin tener la imagen completa en memoria.
+    """
+
+    # Lado mayor aproximado del raster de vista previa
+    PREVIEW_MAX_SIDE = 2560
+
+    def __init__(self, path, raster_cache=None):
+        self.path = path
+        with Image.open(path) as img:
+            self.size = img.size
+            self.format = img.format
+        self.file_size = os.path.getsize(path)
+        self.raster_cache = raster_cache
+
+        self.preview = None
+        self._raster = None
+        self._lock = threading.Lock()
+
+    @property
+    def width(self):
+        return self.size[0]
+
+    @property
+    def height(self):
+        return self.size[1]
+
+    def draft_request(self, max_side):
+        """Tamaño a pedir a Image.draft para que el lado mayor quede >= max_side"""
+        ratio = max_side / max(self.size)
+        return max(1, int(self.size[0] * ratio)), max(1, int(self.size[1] * ratio))
+
+    def load_preview(self, max_side=None):
+        """
+        Decodificar el raster de vista previa sin retener la resolución completa.
+        - JPEG: Image.draft (la escala 1/2, 1/4 u 1/8 se aplica dentro del decodificador).
+        - Sin comprimir (TiledRaster mapeado): se reduce por bandas leídas con read_region,
+          así nunca hay más de una banda a resolución completa en memoria.
+        - Resto: se decodifica completa, se reduce y se descarta la resolución completa
+          (exportar e imprimir leen por regiones desde TiledRaster).
+        """
+        max_side = max_side or self.PREVIEW_MAX_SIDE
+
+        if self.can_draft(max_side):
+            self.preview = self.decode_draft(max_side)
+        elif self._get_raster().backend == 'mmap':
+            self.preview = self.reduce_from_raster(max_side)
+        else:
+            img = Image.open(self.path)
+            img.load()
+            img = normalize_mode(img)
+            factor = self.reduce_factor(max_side)
+            self.preview = img.reduce(factor) if factor > 1 else img
+        return self.preview
+
+    def reduce_factor(self, max_side):
+        """Factor entero de reducción que deja el lado mayor >= max_side (como draft)"""
+        return max(1, max(self.size) // max_side)
+
+    def reduce_from_raster(self, max_side, band_rows=64):
+        """Vista previa reducida leyendo la fuente mapeada por bandas de filas"""
+        raster = self.raster()
+        factor = self.reduce_factor(max_side)
+        width = -(-self.width // factor)
+        height = -(-self.height // factor)
+        preview = Image.new(raster.mode, (width, height))
+
+        # Bandas múltiplo del factor: cada una aporta filas enteras de la reducción
+        step = band_rows * factor
+        for top in range(0, self.height, step):
+            band = raster.read_region((0, top, self.width, min(self.height, top + step)))
+            preview.paste(band.reduce(factor) if factor > 1 else band, (0, top // factor))
+        return preview
+
+    def can_draft(self, max_side):
+        """True si el formato permite decodificar reducido a ~max_side"""
+        return self.format == 'JPEG' and max(self.size) > max_side
+
+    def decode_draft(self, max_side):
+        """Decodificar con escalado DCT (JPEG) a un lado mayor >= max_side"""
+        img = Image.open(self.path)
+        img.draft('RGB', self.draft_request(max_side))
+        img = normalize_mode(img)
+        img.load()
+        return img
+
+    def _get_raster(self):
+        """TiledRaster de la fuente (solo lee el header; no mapea ni decodifica)"""
+        with self._lock:
+            if self._raster is None:
+                self._raster = TiledRaster(self.path, disk_cache=self.raster_cache)
+            return self._raster
+
+    def raster(self):
+        """Acceso por regiones (TiledRaster) sin mantener la imagen completa en memoria"""
+        raster = self._get_raster()
+        raster.prepare()
+        return raster
+
+    def read_region(self, box):
+        """Región (left, top, right, bottom) en px de la fuente sin rotar, o None si es vacía"""
+        return self.raster().read_region(box)
+
+    def close(self):
+        """
+        Liberar el mapeo de la fuente (o del volcado a disco). Si después se vuelve
+        a pedir una región, raster() lo abre de nuevo.
+        """
+        with self._lock:
+            raster = self._raster
+        if raster is not None:
+            raster.close()
+
+
+class LoadCancelled(Exception):
+    """La carga fue cancelada (por el usuario o por otra carga más nueva)"""
+
+
+class ImageLoadTask:
+    """
+    Carga de una imagen en un hilo de fondo con refinamiento progresivo.
+    Las etapas se entregan en el hilo de Tk (polling con after) como
+    on_event(task, stage, payload, percent):
+    - 'header': SourceImage con tamaño y formato (solo se leyó el header)
+    - 'placeholder': PreviewPyramid de baja resolución (draft 1/8) para mostrar ya
+    - 'ready': PreviewPyramid definitivo de la vista previa
+    - 'error': excepción producida durante la carga
+    Con disk_cache, un archivo ya visto (misma ruta, mtime y tamaño) pasa directo
+    de 'header' a 'ready' leyendo la pirámide guardada, sin decodificar la imagen.
+    """
+
+    PLACEHOLDER_MAX_SIDE = 512
+
+    def __init__(self, widget, path, on_event, disk_cache=None, raster_cache=None, poll_ms=30):
+        self.widget = widget
+        self.path = path
+        self.on_event = on_event
+        self.disk_cache = disk_cache
+        self.raster_cache = raster_cache
+        self.poll_ms = poll_ms
+        self.from_cache = False
+
+        self._cancelled = threading.Event()
+        self._events = queue.Queue()
+        self.finished = False
+
+        self._thread = threading.Thread(target=self._run, name="ImageLoadTask", daemon=True)
+        self._thread.start()
+        self._poll_job = self.widget.after(self.poll_ms, self._poll)
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def cancel(self):
+        """Cancelar: las etapas pendientes se descartan y el hilo corta en la próxima etapa"""
+        self._cancelled.set()
+
+    def _check_cancelled(self):
+        if self._cancelled.is_set():
+            raise LoadCancelled()
+
+    def _emit(self, stage, payload, percent):
+        self._events.put((stage, payload, percent))
+
+    def _run(self):
+        source = None
+        try:
+            source = SourceImage(self.path, raster_cache=self.raster_cache)
+            self._emit('header', source, 10)
+            self._check_cancelled()
+
+            pyramid = self._load_cached(source)
+            if pyramid is not None:
+                self.from_cache = True
+                self._emit('ready', pyramid, 100)
+                return
+
+            # Placeholder de baja resolución apenas hay un draft disponible
+            if source.can_draft(SourceImage.PREVIEW_MAX_SIDE):
+                placeholder = source.decode_draft(self.PLACEHOLDER_MAX_SIDE)
+                self._emit('placeholder', PreviewPyramid(placeholder), 35)
+                self._check_cancelled()
+
+            preview = source.load_preview()
+            self._check_cancelled()
+            pyramid = PreviewPyramid(preview)
+            self._emit('ready', pyramid, 100)
+
+            # La pirámide sale del raster de vista previa (acotado): se guarda completa
+            if self.disk_cache is not None:
+                self.disk_cache.store(self.path, self._cache_meta(source), pyramid.levels)
+        except LoadCancelled:
+            # La app descarta esta fuente: no dejar el archivo mapeado hasta el GC
+            if source is not None:
+                source.close()
+        except Exception as e:
+            traceback.print_exc()
+            self._emit('error', e, 100)
+
+    @staticmethod
+    def _cache_meta(source):
+        return {'size': list(source.size), 'format': source.format, 'file_size': source.file_size}
+
+    def _load_cached(self, source):
+        """Pirámide guardada en la caché en disco si coincide con el header, o None"""
+        if self.disk_cache is None:
+            return None
+        entry = self.disk_cache.load(self.path)
+        if entry is None:
+            return None
+        meta, levels = entry
+        if meta.get('size') != list(source.size) or meta.get('format') != source.format:
+            return None
+        source.preview = levels[0]
+        return PreviewPyramid.from_levels(levels)
+
+    def _poll(self):
+        self._poll_job = None
+        while True:
+            try:
+                stage, payload, percent = self._events.get_nowait()
+            except queue.Empty:
+                break
+            if self._cancelled.is_set():
+                continue
+            if stage in ('ready', 'error'):
+                self.finished = True
+            self.on_event(self, stage, payload, percent)
+
+        if self._cancelled.is_set() or self.finished:
+            return
+        if self._thread.is_alive() or not self._events.empty():
+            self._poll_job = self.widget.after(self.poll_ms, self._poll)
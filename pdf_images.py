@@ -0,0 +1,193 @@
+import hashlib
+import io
+import zlib
+from PIL import Image
+
+
+class EncodedImage:
+    """
+    Pixels ya codificados como stream de imagen PDF, en memoria.
+    - 'flate': pixels RGB sin pérdida comprimidos con zlib (FlateDecode)
+    - 'jpeg': JPEG de Pillow embebido tal cual (DCTDecode)
+    ReportLab no vuelve a decodificar ni a comprimir: el stream va directo al PDF.
+    """
+
+    ENCODINGS = ('flate', 'jpeg')
+
+    def __init__(self, size, data, filter_name, color_space='DeviceRGB'):
+        self.size = size
+        self.data = data
+        self.filter_name = filter_name
+        self.color_space = color_space
+        # Nombre del XObject: páginas con pixels idénticos comparten el stream
+        self.name = 'img' + hashlib.sha1(data).hexdigest()
+
+    @property
+    def width(self):
+        return self.size[0]
+
+    @property
+    def height(self):
+        return self.size[1]
+
+    @classmethod
+    def encode(cls, image, encoding='flate', quality=85, level=6):
+        """
+        Codificar una Image (RGB/RGBA; el alfa se aplana sobre blanco como el papel).
+        quality: calidad JPEG (1-95). level: nivel de compresión Flate (1-9).
+        """
+        if encoding not in cls.ENCODINGS:
+            raise ValueError(f"Codificación de imagen desconocida: {encoding}")
+
+        if image.mode == 'RGBA':
+            flat = Image.new('RGB', image.size, 'white')
+            flat.paste(image, (0, 0), image)
+            image = flat
+        elif image.mode != 'RGB':
+            image = image.convert('RGB')
+
+        if encoding == 'jpeg':
+            buffer = io.BytesIO()
+            image.save(buffer, 'JPEG', quality=quality)
+            return cls(image.size, buffer.getvalue(), 'DCTDecode')
+        return cls(image.size, zlib.compress(image.tobytes(), level), 'FlateDecode')
+
+
+class PdfCompression:
+    """
+    Perfil de compresión de las imágenes del PDF.
+    encoding: 'jpeg' (fotos, con pérdida), 'flate' (arte lineal, sin pérdida) o
+    'auto' (se elige por pieza según su contenido, ver choose_encoding).
+    """
+
+    ENCODINGS = ('auto', 'jpeg', 'flate')
+
+    # Calidad del diálogo de impresión -> (calidad JPEG, nivel Flate); None deja el del perfil.
+    # Flate es sin pérdida en cualquier nivel: subirlo casi no achica y triplica el tiempo
+    QUALITY_PRESETS = {'draft': (60, 1), 'normal': (None, None), 'high': (95, None)}
+
+    # Detección automática: lado de la muestra y fracción de pixels que deben cubrir
+    # los colores más frecuentes para tratar la pieza como arte lineal / colores planos
+    SAMPLE_SIDE = 256
+    FLAT_COLORS = 16
+    FLAT_COVERAGE = 0.9
+
+    def __init__(self, encoding='auto', jpeg_quality=85, flate_level=6):
+        if encoding not in self.ENCODINGS:
+            raise ValueError(f"Compresión de PDF desconocida: {encoding}")
+        self.encoding = encoding
+        self.jpeg_quality = jpeg_quality
+        self.flate_level = flate_level
+
+    def with_quality(self, quality):
+        """Mismo perfil ajustado a la calidad del diálogo ('draft', 'normal' o 'high')"""
+        jpeg_quality, flate_level = self.QUALITY_PRESETS.get(quality, (None, None))
+        return PdfCompression(self.encoding,
+                              self.jpeg_quality if jpeg_quality is None else jpeg_quality,
+                              self.flate_level if flate_level is None else flate_level)
+
+    def choose_encoding(self, image):
+        """
+        'jpeg' o 'flate' para la pieza. En 'auto' se cuentan colores en una muestra
+        (NEAREST, sin colores nuevos): si unos pocos cubren casi toda la pieza es arte
+        lineal o colores planos (Flate comprime bien y JPEG dejaría artefactos); si no, foto.
+        """
+        if self.encoding != 'auto':
+            return self.encoding
+
+        sample = image
+        if max(image.size) > self.SAMPLE_SIDE:
+            scale = self.SAMPLE_SIDE / max(image.size)
+            sample = image.resize((max(1, round(image.width * scale)), max(1, round(image.height * scale))),
+                                  Image.NEAREST)
+        pixels = sample.width * sample.height
+        counts = sorted((count for count, _ in sample.getcolors(pixels)), reverse=True)
+        covered = sum(counts[:self.FLAT_COLORS])
+        return 'flate' if covered >= self.FLAT_COVERAGE * pixels else 'jpeg'
+
+    def encode(self, image):
+        """EncodedImage de la pieza según el perfil"""
+        return EncodedImage.encode(image, self.choose_encoding(image),
+                                   quality=self.jpeg_quality, level=self.flate_level)
+
+    def describe(self):
+        """Texto corto para mensajes de la UI"""
+        if self.encoding == 'jpeg':
+            return f"JPEG (calidad {self.jpeg_quality})"
+        if self.encoding == 'flate':
+            return "sin pérdida (Flate)"
+        return f"automática (JPEG calidad {self.jpeg_quality} / Flate)"
+
+
+# Internos de ReportLab que usa draw_encoded_image (probados con reportlab 4.x / 5.x)
+CANVAS_INTERNALS = ('_doc', '_code', '_formsinuse', '_currentPageHasImages')
+DOCUMENT_INTERNALS = ('getXObjectName', 'idToObject', 'Reference', 'addForm')
+XOBJECT_INTERNALS = ('width', 'height', 'bitsPerComponent', 'colorSpace', '_filters', 'streamContent', 'mask')
+
+
+def supports_encoded_streams(pdf):
+    """
+    True si el canvas expone los internos necesarios para registrar streams ya codificados.
+    Arma un XObject de prueba: se calcula una vez por canvas y se pasa a draw_encoded_image.
+    """
+    from reportlab.pdfbase import pdfdoc
+
+    if not all(hasattr(pdf, name) for name in CANVAS_INTERNALS):
+        return False
+    if not all(hasattr(pdf._doc, name) for name in DOCUMENT_INTERNALS):
+        return False
+    xobject_class = getattr(pdfdoc, 'PDFImageXObject', None)
+    if xobject_class is None:
+        return False
+    probe = xobject_class('probe')
+    return all(hasattr(probe, name) for name in XOBJECT_INTERNALS)
+
+
+def draw_encoded_image(pdf, encoded, x, y, width, height, use_internals=None):
+    """
+    Dibujar un EncodedImage en un canvas de ReportLab, como drawImage pero sin
+    archivo intermedio ni recompresión (se registra el XObject con el stream dado).
+    Si la versión de ReportLab no expone esos internos se usa drawImage con un
+    ImageReader en memoria (el JPEG se embebe igual; Flate se vuelve a comprimir).
+    use_internals: supports_encoded_streams(pdf) ya calculado (si es None se calcula).
+    """
+    from reportlab.pdfbase import pdfdoc
+
+    if use_internals is None:
+        use_internals = supports_encoded_streams(pdf)
+    if not use_internals:
+        _draw_with_image_reader(pdf, encoded, x, y, width, height)
+        return
+
+    doc = pdf._doc
+    reg_name = doc.getXObjectName(encoded.name)
+    if doc.idToObject.get(reg_name) is None:
+        xobject = pdfdoc.PDFImageXObject(encoded.name)
+        xobject.width, xobject.height = encoded.size
+        xobject.bitsPerComponent = 8
+        xobject.colorSpace = encoded.color_space
+        xobject._filters = (encoded.filter_name,)
+        xobject.streamContent = encoded.data
+        xobject.mask = None
+        doc.Reference(xobject, reg_name)
+        doc.addForm(encoded.name, xobject)
+
+    pdf._currentPageHasImages = 1
+    pdf.saveState()
+    pdf.translate(x, y)
+    pdf.scale(width, height)
+    pdf._code.append(f"/{reg_name} Do")
+    pdf.restoreState()
+    pdf._formsinuse.append(encoded.name)
+
+
+def _draw_with_image_reader(pdf, encoded, x, y, width, height):
+    """Camino de la API pública de ReportLab (drawImage + ImageReader, sin archivos)"""
+    from reportlab.lib.utils import ImageReader
+
+    if encoded.filter_name == 'DCTDecode':
+        # ImageReader reconoce el JPEG y lo embebe sin recodificar
+        source = io.BytesIO(encoded.data)
+    else:
+        source = Image.frombytes('RGB', encoded.size, zlib.decompress(encoded.data))
+    pdf.drawImage(ImageReader(source), x, y, width=width, height=height)
@@ -0,0 +1,254 @@
+import os
+from collections import deque
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor
+from PIL import Image, ImageDraw, ImageFont
+from tile_renderer import TileRenderer
+from pdf_images import PdfCompression, draw_encoded_image, supports_encoded_streams
+
+
+class PosterJob:
+    """
+    Motor de salida sin Tk: geometría de hojas, sangrado, raster por hoja y PDF.
+    La exportación y todos los modos de impresión usan este mismo motor, así
+    cualquier optimización (caché, paralelismo, streaming) se hace en un solo lugar.
+    """
+
+    # Decoraciones de la hoja (mm / puntos), iguales en PDF y en raster
+    PAGE_NUMBER_OFFSET_MM = 10
+    PAGE_NUMBER_PT = 12
+    BLEED_LINE_PT = 0.5
+
+    # Hilos de render por defecto (acotado: cada hoja en vuelo ocupa su raster en memoria)
+    MAX_WORKERS = 8
+
+    def __init__(self, source, angle, img_rect, layout, dpi, bleed_mode=False,
+                 bleed_direction='left', show_page_numbers=True, effective_dpi=None,
+                 compression=None, workers=None):
+        """
+        source: SourceImage. angle: rotación en grados. img_rect: (x, y, ancho, alto) mm.
+        layout: TileLayout (papel, solapado y hojas con imagen). dpi: resolución de salida.
+        compression: PdfCompression de las imágenes del PDF (por defecto 'auto').
+        workers: hilos para renderizar hojas en paralelo (por defecto según los núcleos).
+        """
+        self.source = source
+        self.angle = angle
+        self.img_rect = img_rect
+        self.layout = layout
+        self.dpi = dpi
+        self.effective_dpi = effective_dpi if effective_dpi is not None else dpi
+        self.bleed_mode = bleed_mode
+        self.bleed_direction = bleed_direction
+        self.show_page_numbers = show_page_numbers
+        self.compression = compression or PdfCompression()
+        self.workers = workers or min(self.MAX_WORKERS, os.cpu_count() or 1)
+
+        self.renderer = TileRenderer(source, angle, img_rect)
+
+    @classmethod
+    def from_app_data(cls, app_data):
+        """Trabajo a partir del dict app_data que arma PosterPrinter"""
+        transform = app_data['image_transform']
+        width_mm = app_data['img_width']
+        return cls(app_data['source_image'], app_data['rotation_angle'],
+                   (app_data['img_x'], app_data['img_y'], width_mm, app_data['img_height']),
+                   app_data['tile_layout'],
+                   transform.output_dpi(width_mm, app_data['max_output_dpi']),
+                   bleed_mode=app_data['bleed_mode'],
+                   bleed_direction=app_data['bleed_direction'],
+                   show_page_numbers=app_data['show_page_numbers'],
+                   effective_dpi=transform.effective_dpi(width_mm),
+                   compression=PdfCompression(app_data['pdf_compression'], app_data['jpeg_quality']))
+
+    @property
+    def paper_size(self):
+        return self.layout.paper_w, self.layout.paper_h
+
+    @property
+    def pages(self):
+        return self.layout.pages
+
+    def sheet_bleed(self, row, col):
+        """
+        Sangrado (izq, der, arriba, abajo) en mm de la hoja: en los bordes interiores
+        el solapado queda del lado que tapa la hoja vecina según la dirección elegida.
+        """
+        if not self.bleed_mode:
+            return 0, 0, 0, 0
+
+        overlap = self.layout.overlap
+        if self.bleed_direction == 'left':
+            return (0 if col == self.layout.min_col else overlap, 0,
+                    0 if row == self.layout.min_row else overlap, 0)
+        return (0, 0 if col == self.layout.max_col else overlap,
+                0, 0 if row == self.layout.max_row else overlap)
+
+    def sheet_area(self, row, col):
+        """Rectángulo (left, top, right, bottom) mm del póster que ocupa la hoja"""
+        left, top, right, bottom = self.layout.tile_rect(row, col)
+        bleed_left, _, _, bleed_bottom = self.sheet_bleed(row, col)
+        # El sangrado desplaza la imagen dentro de la hoja
+        return left - bleed_left, top - bleed_bottom, right - bleed_left, bottom - bleed_bottom
+
+    def render_piece(self, row, col, dpi=None):
+        """(pieza, rect_mm, area_mm) de la hoja; pieza y rect son None si no tiene imagen"""
+        area = self.sheet_area(row, col)
+        rendered = self.renderer.render(area, dpi or self.dpi)
+        if rendered is None:
+            return None, None, area
+        return rendered[0], rendered[1], area
+
+    def bleed_lines(self, row, col):
+        """Líneas indicadoras del borde de sangrado [(x1, y1, x2, y2)] en mm desde arriba-izq"""
+        if not self.bleed_mode:
+            return []
+        paper_w, paper_h = self.paper_size
+        bleed_left, bleed_right, bleed_top, bleed_bottom = self.sheet_bleed(row, col)
+
+        lines = []
+        if self.bleed_direction == 'left':
+            if bleed_left:
+                lines.append((bleed_left, 0, bleed_left, paper_h))
+            if bleed_top:
+                lines.append((0, bleed_top, paper_w, bleed_top))
+        else:
+            if bleed_right:
+                lines.append((paper_w - bleed_right, 0, paper_w - bleed_right, paper_h))
+            if bleed_bottom:
+                lines.append((0, paper_h - bleed_bottom, paper_w, paper_h - bleed_bottom))
+        return lines
+
+    def render_sheet(self, row, col, dpi=None):
+        """Hoja completa como raster RGB (fondo blanco) con pieza, número y sangrado"""
+        dpi = dpi or self.dpi
+        paper_w, paper_h = self.paper_size
+        px = dpi / 25.4
+        sheet = Image.new('RGB', (max(1, round(paper_w * px)), max(1, round(paper_h * px))), 'white')
+
+        piece, rect, area = self.render_piece(row, col, dpi)
+        if piece is not None:
+            if piece.mode == 'RGBA':
+                sheet.paste(piece, (round((rect[0] - area[0]) * px), round((rect[1] - area[1]) * px)), piece)
+            else:
+                sheet.paste(piece, (round((rect[0] - area[0]) * px), round((rect[1] - area[1]) * px)))
+
+        draw = ImageDraw.Draw(sheet)
+        if self.show_page_numbers:
+            offset = self.PAGE_NUMBER_OFFSET_MM * px
+            size = max(6, round(self.PAGE_NUMBER_PT / 72 * dpi))
+            font = self.page_number_font(size)
+            # Como en el PDF: la línea base queda a 10 mm del borde superior
+            draw.text((offset, offset - size), str(self.layout.page_number(row, col)),
+                      fill='#333333', font=font)
+
+        width = max(1, round(self.BLEED_LINE_PT / 72 * dpi))
+        for x1, y1, x2, y2 in self.bleed_lines(row, col):
+            draw.line((x1 * px, y1 * px, x2 * px, y2 * px), fill='red', width=width)
+        return sheet
+
+    @staticmethod
+    def page_number_font(size):
+        """Arial Bold (como Helvetica-Bold del PDF) o la fuente por defecto de Pillow"""
+        try:
+            return ImageFont.truetype("arialbd.ttf", size)
+        except Exception:
+            try:
+                return ImageFont.load_default(size)
+            except TypeError:
+                # Pillow < 10.1: fuente bitmap sin tamaño
+                return ImageFont.load_default()
+
+    def map_pages(self, func, pages, workers=None):
+        """
+        func(row, col) para cada hoja en un pool de hilos, entregando los resultados en
+        el orden de pages. Los hilos comparten la fuente (SourceImage / TiledRaster
+        mapeado) sin copiarla; resample, JPEG y zlib de Pillow liberan el GIL.
+        Se mantienen a lo sumo 2 hojas en vuelo por hilo para acotar la memoria.
+        """
+        workers = workers or self.workers
+        if workers <= 1 or len(pages) <= 1:
+            for row, col in pages:
+                yield func(row, col)
+            return
+
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="PosterJob") as pool:
+            remaining = iter(pages)
+            pending = deque(pool.submit(func, row, col) for row, col in islice(remaining, workers * 2))
+            try:
+                while pending:
+                    result = pending.popleft().result()
+                    page = next(remaining, None)
+                    if page is not None:
+                        pending.append(pool.submit(func, *page))
+                    yield result
+            finally:
+                # Consumidor cortado (error o cancelación): no renderizar lo que falta
+                for future in pending:
+                    future.cancel()
+
+    def iter_sheets(self, pages=None, dpi=None, transpose=None):
+        """(row, col, hoja RGB) en orden de página, renderizadas en paralelo"""
+        pages = self.pages if pages is None else pages
+
+        def render(row, col):
+            sheet = self.render_sheet(row, col, dpi)
+            return row, col, sheet if transpose is None else sheet.transpose(transpose)
+
+        return self.map_pages(render, pages)
+
+    def encode_pdf_piece(self, row, col):
+        """(EncodedImage, rect_mm, area_mm) de la hoja; imagen y rect son None si no tiene imagen"""
+        piece, rect, area = self.render_piece(row, col)
+        if piece is None:
+            return None, None, area
+        return self.compression.encode(piece), rect, area
+
+    def draw_pdf_page(self, pdf, row, col, encoded_piece=None, use_internals=None):
+        """
+        Dibujar la hoja (row, col) en la página actual de un canvas de ReportLab.
+        La página embebe un único XObject con los pixels que caen en la hoja
+        (solapado incluido, recortado a la imagen), nunca la imagen completa.
+        encoded_piece: resultado de encode_pdf_piece ya calculado (si no, se calcula).
+        use_internals: supports_encoded_streams del canvas, calculado una vez por documento.
+        """
+        from reportlab.lib.units import mm
+
+        page_h = self.layout.paper_h * mm
+        encoded, rect, area = encoded_piece or self.encode_pdf_piece(row, col)
+        if encoded is not None:
+            # Stream ya codificado en memoria: sin PNG temporal ni recompresión
+            draw_encoded_image(pdf, encoded,
+                               (rect[0] - area[0]) * mm,
+                               page_h - (rect[3] - area[1]) * mm,
+                               (rect[2] - rect[0]) * mm,
+                               (rect[3] - rect[1]) * mm,
+                               use_internals)
+
+        if self.show_page_numbers:
+            pdf.setFillColorRGB(0.2, 0.2, 0.2)
+            pdf.setFont("Helvetica-Bold", self.PAGE_NUMBER_PT)
+            pdf.drawString(self.PAGE_NUMBER_OFFSET_MM * mm, page_h - self.PAGE_NUMBER_OFFSET_MM * mm,
+                           str(self.layout.page_number(row, col)))
+
+        lines = self.bleed_lines(row, col)
+        if lines:
+            pdf.setStrokeColorRGB(1, 0, 0)
+            pdf.setLineWidth(self.BLEED_LINE_PT)
+            for x1, y1, x2, y2 in lines:
+                pdf.line(x1 * mm, page_h - y1 * mm, x2 * mm, page_h - y2 * mm)
+
+    def write_pdf(self, filename, pages=None):
+        """Generar el PDF con una página por hoja (todas o las pasadas en pages)"""
+        from reportlab.pdfgen import canvas as pdf_canvas
+        from reportlab.lib.units import mm
+
+        pages = self.pages if pages is None else pages
+        pdf = pdf_canvas.Canvas(filename, pagesize=(self.layout.paper_w * mm, self.layout.paper_h * mm))
+        use_internals = supports_encoded_streams(pdf)
+        # Render y codificación en paralelo; el canvas se escribe en orden en este hilo
+        encoded_pieces = self.map_pages(self.encode_pdf_piece, pages)
+        for (row, col), encoded_piece in zip(pages, encoded_pieces):
+            self.draw_pdf_page(pdf, row, col, encoded_piece, use_internals)
+            pdf.showPage()
+        pdf.save()
+        return len(pages)
@@ -10,9 +10,17 @@ import os
 import sys
 import json
 import random
-import tempfile
+import time
 from about import show_about_dialog
 from print_dialog import show_print_dialog
+from preview_cache import PreviewCache
+from workspace_scene import WorkspaceScene
+from redraw_scheduler import RedrawScheduler
+from preview_worker import PreviewWorker
+from geometry import ImageTransform, HitTester, TileLayout
+from image_loader import ImageLoadTask
+from poster_engine import PosterJob
+from disk_cache import DiskCache
 
 # Drag & Drop
 try:
@@ -24,10 +32,16 @@ except ImportError:
 
 class FontManager:
     """Gestor de fuentes con fallback automático"""
+    # Orden de preferencia; se usa la primera familia instalada
+    FALLBACK_FAMILIES = ('Aptos', 'Segoe UI', 'Calibri', 'Arial')
+
     def __init__(self):
         self.base_path = self._get_base_path()
         self.fonts_loaded = {}
+        self.family = None
+        self._font_cache = {}  # (size, weight, slant) -> tkFont.Font
         self.load_aptos_fonts()
+        self.resolve_family()
     
     def _get_base_path(self):
         """Obtener ruta base del proyecto"""
@@ -57,31 +71,26 @@ class FontManager:
                 except Exception as e:
                     print(f"Error cargando {font_name}: {e}")
     
+    def resolve_family(self):
+        """Determinar una sola vez la familia disponible consultando tkFont.families()"""
+        if self.family is None:
+            try:
+                available = set(tkFont.families())
+            except Exception:
+                # Sin ventana raíz todavía: se reintenta en el primer get_font
+                return None
+            self.family = next((f for f in self.FALLBACK_FAMILIES if f in available), 'Arial')
+            print(f"✓ Familia de fuente: {self.family}")
+        return self.family
+    
     def get_font(self, size=10, weight='normal', slant='roman'):
-        """Obtener fuente con fallback automático"""
-        # Intentar Aptos primero
-        try:
-            if weight == 'bold':
-                return tkFont.Font(family='Aptos', size=size, weight='bold', slant=slant)
-            else:
-                return tkFont.Font(family='Aptos', size=size, weight=weight, slant=slant)
-        except Exception:
-            pass
-
-        # Fallback a Segoe UI
-        try:
-            return tkFont.Font(family='Segoe UI', size=size, weight=weight, slant=slant)
-        except Exception:
-            pass
-
-        # Fallback a Calibri
-        try:
-            return tkFont.Font(family='Calibri', size=size, weight=weight, slant=slant)
-        except Exception:
-            pass
-        
-        # Fallback final a Arial
-        return tkFont.Font(family='Arial', size=size, weight=weight, slant=slant)
+        """Obtener fuente (memoizada por tamaño/peso/estilo) con fallback automático"""
+        key = (size, weight, slant)
+        font = self._font_cache.get(key)
+        if font is None:
+            font = tkFont.Font(family=self.resolve_family() or 'Arial', size=size, weight=weight, slant=slant)
+            self._font_cache[key] = font
+        return font
 
 
 class VersionManager:
@@ -146,6 +155,24 @@ class VersionManager:
 
 
 class PosterPrinter:
+    # Margen alrededor de la vista que se dibuja por adelantado (px de canvas)
+    VIEWPORT_MARGIN_PX = 256
+    # Tamaño de bloque al que se alinea el recorte visible de la imagen
+    IMAGE_CHUNK_PX = 256
+    # Límite de frames por segundo de la vista previa
+    MAX_PREVIEW_FPS = 60
+    # Techos de resolución de salida seleccionables (DPI)
+    OUTPUT_DPI_CHOICES = (150, 200, 300, 600)
+    # Compresión de imágenes del PDF: (valor de PdfCompression, texto)
+    PDF_COMPRESSION_CHOICES = (('auto', "Automática (según contenido)"),
+                               ('jpeg', "JPEG (fotos)"),
+                               ('flate', "Sin pérdida (arte lineal)"))
+    # Inactividad (ms) tras un gesto antes de re-renderizar en alta calidad
+    SETTLE_DELAY_MS = 180
+    # Espacio de trabajo: hojas libres alrededor de la imagen y tamaño mínimo (hojas por lado)
+    WORKSPACE_MARGIN_PAGES = 3
+    WORKSPACE_MIN_PAGES = 6
+
     def __init__(self, root):
         self.root = root
         self.root.title("Poster Printer - Impresión en Tiles")
@@ -164,8 +191,28 @@ class PosterPrinter:
         
         # Variables de configuración
         self.image_path = None
-        self.original_image = None
+        self.source_image = None
         self.display_image = None
+        self.preview_cache = PreviewCache()
+        self.preview_pyramid = None
+        
+        # Carga asíncrona de imagen
+        self.load_task = None
+        self._load_on_success = None
+        
+        # Caché persistente de vistas previas (reabrir un archivo no lo vuelve a decodificar)
+        self.disk_cache = DiskCache()
+        # Rasters completos volcados a disco para leer por regiones (impresión/exportación)
+        self.raster_cache = DiskCache(DiskCache.default_directory('raster_cache'),
+                                      max_bytes=8 * 1024 * 1024 * 1024, max_age_days=7)
+        self._load_applied = False
+        
+        # Re-muestreo en hilo de fondo; se muestra el último frame bueno mientras tanto
+        self.preview_worker = PreviewWorker(self.root, self._on_preview_rendered,
+                                            on_error=self._on_preview_failed)
+        self._inflight_key = None
+        self._last_frame = None
+        self._placeholder = None
         self.paper_sizes = {
             'A4': (210, 297),
             'A3': (297, 420),
@@ -180,9 +227,20 @@ class PosterPrinter:
         self.show_cut_marks = tk.BooleanVar(value=True)
         self.show_page_numbers = tk.BooleanVar(value=True)
         self.rotation_angle = tk.IntVar(value=0)
+        
+        # Geometría de la imagen (rotación, extensión rotada, proporción) cacheada
+        self.image_transform = ImageTransform()
         self.bleed_mode = tk.BooleanVar(value=False)
         self.bleed_direction = tk.StringVar(value='left')
         
+        # Techo de resolución de salida; la fuente de baja resolución se exporta a su DPI real
+        self.max_output_dpi = tk.IntVar(value=300)
+        self._dpi_text = None
+        
+        # Compresión de imágenes del PDF (exportar y motores que generan PDF)
+        self.pdf_compression = tk.StringVar(value='auto')
+        self.jpeg_quality = tk.IntVar(value=85)
+        
         # Variables de imagen (en mm)
         self.img_x = 0
         self.img_y = 0
@@ -192,20 +250,32 @@ class PosterPrinter:
         # Variables de interacción
         self.drag_data = {"x": 0, "y": 0, "dragging": False, "resizing": False, "handle": None}
         self.selected = False
+        self.hit_tester = HitTester(handle_px=WorkspaceScene.HANDLE_SIZE * 2)
+        self._canvas_cursor = 'arrow'
         
         # Escala de visualización (pixels por mm)
         self.display_scale = 1.5
         
-        # Área de trabajo grande
-        self.workspace_cols = 20
-        self.workspace_rows = 20
+        # Redibujo agrupado: los eventos solo invalidan, se renderiza máx. 1 vez por frame
+        self.redraw = RedrawScheduler(self.root, self.update_preview, max_fps=self.MAX_PREVIEW_FPS)
+        
+        # Calidad interactiva: filtros rápidos mientras dura un gesto, LANCZOS al asentarse
+        self.interactive = False
+        self._settle_job = None
+        
+        # Área de trabajo virtual: se dimensiona en cada frame (ver get_workspace_extent)
+        self.workspace_cols = self.WORKSPACE_MIN_PAGES
+        self.workspace_rows = self.WORKSPACE_MIN_PAGES
         
         # Canvas IDs
         self.image_id = None
         self.selection_rect = None
         self.resize_handles = []
+        self._pages_text = None
+        self._tile_layout = None
         
         self.create_ui()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
 
         # Atajos de teclado
         self.root.bind("<Control-o>", lambda e: self.load_image())
@@ -282,6 +352,10 @@ class PosterPrinter:
                                    font=self.font_manager.get_font(9))
         self.info_label.pack(pady=5, padx=10)
         
+        # Visible solo mientras hay una carga en curso
+        self.cancel_load_button = ttk.Button(scrollable_frame, text="✖ Cancelar carga",
+                                             command=self.cancel_image_load)
+        
         ttk.Separator(scrollable_frame, orient='horizontal').pack(fill='x', pady=10)
         
         # Papel
@@ -293,7 +367,7 @@ class PosterPrinter:
         self.paper_combo = ttk.Combobox(paper_frame, values=list(self.paper_sizes.keys()), state='readonly')
         self.paper_combo.set('A4')
         self.paper_combo.pack(fill='x')
-        self.paper_combo.bind('<<ComboboxSelected>>', lambda e: self.update_preview())
+        self.paper_combo.bind('<<ComboboxSelected>>', lambda e: self.request_redraw())
         
         orient_frame = ttk.Frame(scrollable_frame)
         orient_frame.pack(pady=5, padx=10, fill='x')
@@ -316,11 +390,11 @@ class PosterPrinter:
         rotation_frame.pack(pady=5, padx=10, fill='x')
         ttk.Label(rotation_frame, text="Rotación (°):", font=self.font_manager.get_font(9)).pack(anchor='w')
         rotation_slider = ttk.Scale(rotation_frame, from_=0, to=360, variable=self.rotation_angle,
-                                   orient='horizontal', command=lambda v: self.update_preview())
+                                   orient='horizontal', command=self.on_rotation_change)
         rotation_slider.pack(fill='x')
         self.rotation_label = ttk.Label(rotation_frame, text="0°", font=self.font_manager.get_font(9))
         self.rotation_label.pack(anchor='w')
-        self.rotation_angle.trace('w', lambda *args: self.rotation_label.config(text=f"{self.rotation_angle.get()}°"))
+        self.rotation_angle.trace('w', lambda *args: self.on_rotation_var_change())
         
         btn_frame = ttk.Frame(scrollable_frame)
         btn_frame.pack(pady=5, padx=10, fill='x')
@@ -336,31 +410,56 @@ class PosterPrinter:
         overlap_frame.pack(pady=5, padx=10, fill='x')
         ttk.Label(overlap_frame, text="Superposición (mm):", font=self.font_manager.get_font(9)).pack(anchor='w')
         overlap_slider = ttk.Scale(overlap_frame, from_=0, to=50, variable=self.overlap_mm,
-                                  orient='horizontal', command=lambda v: self.update_preview())
+                                  orient='horizontal', command=lambda v: self.request_redraw())
         overlap_slider.pack(fill='x')
         self.overlap_label = ttk.Label(overlap_frame, text="5.0 mm", font=self.font_manager.get_font(9))
         self.overlap_label.pack(anchor='w')
         self.overlap_mm.trace('w', lambda *args: self.overlap_label.config(text=f"{self.overlap_mm.get():.1f} mm"))
         
+        dpi_frame = ttk.Frame(scrollable_frame)
+        dpi_frame.pack(pady=5, padx=10, fill='x')
+        ttk.Label(dpi_frame, text="Resolución máxima (DPI):", font=self.font_manager.get_font(9)).pack(anchor='w')
+        dpi_combo = ttk.Combobox(dpi_frame, values=self.OUTPUT_DPI_CHOICES, textvariable=self.max_output_dpi,
+                                 state='readonly', width=8)
+        dpi_combo.pack(anchor='w')
+        dpi_combo.bind('<<ComboboxSelected>>', lambda e: self.request_redraw())
+        self.dpi_label = ttk.Label(dpi_frame, text="Salida: -", font=self.font_manager.get_font(9),
+                                   foreground='gray')
+        self.dpi_label.pack(anchor='w')
+        
+        compression_frame = ttk.Frame(scrollable_frame)
+        compression_frame.pack(pady=5, padx=10, fill='x')
+        ttk.Label(compression_frame, text="Compresión de imágenes (PDF):", font=self.font_manager.get_font(9)).pack(anchor='w')
+        for value, text in self.PDF_COMPRESSION_CHOICES:
+            ttk.Radiobutton(compression_frame, text=text, value=value,
+                           variable=self.pdf_compression).pack(anchor='w')
+        ttk.Label(compression_frame, text="Calidad JPEG:", font=self.font_manager.get_font(9)).pack(anchor='w')
+        quality_slider = ttk.Scale(compression_frame, from_=40, to=95, variable=self.jpeg_quality,
+                                   orient='horizontal', command=lambda v: self.jpeg_quality.set(round(float(v))))
+        quality_slider.pack(fill='x')
+        self.jpeg_quality_label = ttk.Label(compression_frame, text="85", font=self.font_manager.get_font(9))
+        self.jpeg_quality_label.pack(anchor='w')
+        self.jpeg_quality.trace('w', lambda *args: self.jpeg_quality_label.config(text=f"{self.jpeg_quality.get()}"))
+        
         ttk.Checkbutton(scrollable_frame, text="Mostrar marcas de corte", variable=self.show_cut_marks,
-                       command=self.update_preview).pack(pady=5, padx=10, anchor='w')
+                       command=self.request_redraw).pack(pady=5, padx=10, anchor='w')
         
         ttk.Checkbutton(scrollable_frame, text="Numerar páginas en impresión", variable=self.show_page_numbers,
-                       command=self.update_preview).pack(pady=5, padx=10, anchor='w')
+                       command=self.request_redraw).pack(pady=5, padx=10, anchor='w')
         
         # Modo sin bordes (sangrado)
         ttk.Checkbutton(scrollable_frame, text="☑ Impresión sin bordes (sangrado)", variable=self.bleed_mode,
-                       command=self.update_preview).pack(pady=5, padx=10, anchor='w')
+                       command=self.request_redraw).pack(pady=5, padx=10, anchor='w')
         
         bleed_frame = ttk.Frame(scrollable_frame)
         bleed_frame.pack(pady=5, padx=20, fill='x')
         ttk.Label(bleed_frame, text="Dirección del borde:", font=self.font_manager.get_font(9)).pack(anchor='w')
         ttk.Radiobutton(bleed_frame, text="⬅ Izquierda/Arriba (derecha tapa izq, abajo tapa arriba)", 
                        value='left', variable=self.bleed_direction,
-                       command=self.update_preview).pack(anchor='w')
+                       command=self.request_redraw).pack(anchor='w')
         ttk.Radiobutton(bleed_frame, text="➡ Derecha/Abajo (izquierda tapa der, arriba tapa abajo)", 
                        value='right', variable=self.bleed_direction,
-                       command=self.update_preview).pack(anchor='w')
+                       command=self.request_redraw).pack(anchor='w')
         
         ttk.Separator(scrollable_frame, orient='horizontal').pack(fill='x', pady=10)
         
@@ -389,10 +488,11 @@ class PosterPrinter:
         canvas_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
         
         self.canvas = tk.Canvas(canvas_frame, bg='#f0f0f0', cursor='arrow')
-        h_scrollbar = ttk.Scrollbar(canvas_frame, orient=tk.HORIZONTAL, command=self.canvas.xview)
-        v_scrollbar = ttk.Scrollbar(canvas_frame, orient=tk.VERTICAL, command=self.canvas.yview)
+        h_scrollbar = ttk.Scrollbar(canvas_frame, orient=tk.HORIZONTAL, command=self.on_canvas_xview)
+        v_scrollbar = ttk.Scrollbar(canvas_frame, orient=tk.VERTICAL, command=self.on_canvas_yview)
         
         self.canvas.configure(xscrollcommand=h_scrollbar.set, yscrollcommand=v_scrollbar.set)
+        self.scene = WorkspaceScene(self.canvas, self.font_manager)
         
         self.canvas.grid(row=0, column=0, sticky='nsew')
         h_scrollbar.grid(row=1, column=0, sticky='ew')
@@ -407,6 +507,8 @@ class PosterPrinter:
         self.canvas.bind("<ButtonRelease-1>", self.on_mouse_up)
         self.canvas.bind("<Motion>", self.on_mouse_move)
         self.canvas.bind("<MouseWheel>", self.on_mousewheel)
+        # Redibujar los tiles expuestos al cambiar el tamaño de la vista
+        self.canvas.bind("<Configure>", lambda e: self.request_redraw())
         
         # Label de ayuda + versión clickeable (botón disimulado) con rotación
         help_frame = ttk.Frame(right_frame)
@@ -453,62 +555,153 @@ class PosterPrinter:
             width, height = height, width
         return width, height
     
-    def get_pages_with_image(self):
+    def request_redraw(self):
+        """Invalidar la vista previa; el scheduler agrupa los pedidos por frame"""
+        self.redraw.invalidate()
+    
+    def begin_interaction(self):
         """
-        Calcula qué páginas contienen el RECTÁNGULO DE SELECCIÓN (borde punteado).
-        FIX v2.11.9: Usa el bounding box del rectángulo de selección, no solo la imagen.
+        Marcar que hay un gesto en curso (arrastre de esquina, rotación, zoom).
+        La vista usa calidad rápida hasta que la entrada quede inactiva SETTLE_DELAY_MS.
+        """
+        self.interactive = True
+        if self._settle_job is not None:
+            self.root.after_cancel(self._settle_job)
+        self._settle_job = self.root.after(self.SETTLE_DELAY_MS, self._settle_interaction)
+    
+    def _settle_interaction(self):
+        """Fin del gesto: re-renderizar en alta calidad"""
+        self._settle_job = None
+        self.interactive = False
+        self.request_redraw()
+    
+    def get_tile_layout(self):
+        """
+        TileLayout actual (memoizado): se recalcula solo si cambia papel, orientación,
+        solapado o el rectángulo de selección.
         """
-        if self.original_image is None:
-            return []
-        
         paper_w, paper_h = self.get_paper_size_mm()
-        overlap = self.overlap_mm.get()
-        effective_w = paper_w - overlap
-        effective_h = paper_h - overlap
+        selection = None
+        if self.source_image is not None:
+            selection = (self.img_x, self.img_y, self.img_width, self.img_height)
+        
+        key = TileLayout.make_key(paper_w, paper_h, self.overlap_mm.get(), selection)
+        if self._tile_layout is None or self._tile_layout.key != key:
+            self._tile_layout = TileLayout(paper_w, paper_h, self.overlap_mm.get(), selection)
+        return self._tile_layout
+    
+    def start_image_load(self, file_path, on_success=None):
+        """
+        Cargar una imagen en segundo plano. Una carga nueva cancela la anterior;
+        on_success se llama cuando la vista previa definitiva está lista.
+        """
+        if self.load_task is not None:
+            self.load_task.cancel()
         
-        # Bounding box del RECTÁNGULO DE SELECCIÓN (no de la imagen interior)
-        # El rectángulo de selección está definido por img_x, img_y, img_width, img_height
-        selection_left = self.img_x
-        selection_top = self.img_y
-        selection_right = self.img_x + self.img_width
-        selection_bottom = self.img_y + self.img_height
-        
-        # Calcular rango de páginas que el rectángulo de selección toca
-        start_col = max(0, int(selection_left / effective_w))
-        start_row = max(0, int(selection_top / effective_h))
-        end_col = int(selection_right / effective_w) + 1
-        end_row = int(selection_bottom / effective_h) + 1
-        
-        pages_with_content = []
-        
-        for row in range(start_row, end_row):
-            for col in range(start_col, end_col):
-                # Calcular bounds de esta página
-                page_left = col * effective_w
-                page_top = row * effective_h
-                page_right = page_left + paper_w
-                page_bottom = page_top + paper_h
-                
-                # Verificar si el RECTÁNGULO DE SELECCIÓN intersecta con esta página
-                intersects = not (selection_right <= page_left or selection_left >= page_right or
-                                selection_bottom <= page_top or selection_top >= page_bottom)
-                
-                if intersects:
-                    pages_with_content.append((row, col))
+        self._load_on_success = on_success
+        self._load_applied = False
+        self.load_task = ImageLoadTask(self.root, file_path, self._on_load_event,
+                                       disk_cache=self.disk_cache, raster_cache=self.raster_cache)
         
-        return pages_with_content
+        self.info_label.config(text=f"{os.path.basename(file_path)}\nCargando... 0%")
+        self.cancel_load_button.pack(after=self.info_label, pady=(0, 5), padx=10, fill='x')
     
-    def _process_loaded_image(self, file_path):
-        """Cargar y procesar una imagen desde ruta. Usado por load_image() y on_drop()."""
-        self.image_path = file_path
-        self.original_image = Image.open(file_path)
-
-        if self.original_image.mode not in ('RGB', 'RGBA'):
-            self.original_image = self.original_image.convert('RGB')
+    def cancel_image_load(self):
+        """Cancelar la carga en curso; si ya se había aplicado el header se descarta la imagen"""
+        if self.load_task is None:
+            return
+        self.load_task.cancel()
+        self.load_task = None
+        self.cancel_load_button.pack_forget()
+        
+        if self._load_applied:
+            self.set_source_image(None)
+            self.image_path = None
+            self._reset_preview(None)
+            self.info_label.config(text="Carga cancelada - No hay imagen cargada")
+            self.request_redraw()
+        else:
+            self._restore_info_label()
+    
+    def _restore_info_label(self):
+        if self.source_image is None:
+            self.info_label.config(text="No hay imagen cargada")
+        else:
+            width, height = self.source_image.size
+            file_size = self.source_image.file_size / 1024 / 1024
+            self.info_label.config(text=f"{os.path.basename(self.image_path)}\n{width}x{height} px\n{file_size:.2f} MB")
+    
+    def _on_load_event(self, task, stage, payload, percent):
+        """Etapas de ImageLoadTask (ya en el hilo de Tk)"""
+        if task is not self.load_task:
+            return
+        
+        if stage == 'header':
+            self._apply_loaded_source(payload)
+        elif stage == 'placeholder':
+            # Baja resolución inmediata mientras se decodifica la vista previa
+            self._reset_preview(payload)
+            self.request_redraw()
+        elif stage == 'ready':
+            self._reset_preview(payload)
+            self.load_task = None
+            self.cancel_load_button.pack_forget()
+            self._restore_info_label()
+            self.request_redraw()
+            stats = self.disk_cache.stats
+            origin = "caché en disco" if task.from_cache else "decodificada"
+            print(f"✓ Vista previa {origin} (caché: {stats['hits']} aciertos, {stats['misses']} fallos)")
+            if self._load_on_success is not None:
+                self._load_on_success()
+            return
+        elif stage == 'error':
+            self.load_task = None
+            self.cancel_load_button.pack_forget()
+            if self._load_applied:
+                self.set_source_image(None)
+                self.image_path = None
+                self._reset_preview(None)
+                self.request_redraw()
+            self._restore_info_label()
+            messagebox.showerror("Error", f"No se pudo cargar la imagen:\n{str(payload)}")
+            return
+        
+        self.info_label.config(text=f"{os.path.basename(task.path)}\nCargando... {percent}%")
+    
+    def _reset_preview(self, pyramid):
+        """Reemplazar la pirámide de vista previa; los rasters cacheados dejan de valer"""
+        self.preview_worker.cancel()
+        self.preview_cache.clear()
+        self._inflight_key = None
+        self._last_frame = None
+        self._placeholder = None
+        self.scene.clear_image()
+        self.preview_pyramid = pyramid
+    
+    def set_source_image(self, source):
+        """Reemplazar la imagen fuente cerrando el mapeo de la anterior (en Windows lo bloquea)"""
+        previous = self.source_image
+        self.source_image = source
+        if previous is not None and previous is not source:
+            previous.close()
+    
+    def on_close(self):
+        """Cierre de la ventana: cortar la carga en curso y liberar la fuente antes de salir"""
+        if self.load_task is not None:
+            self.load_task.cancel()
+            self.load_task = None
+        self.set_source_image(None)
+        self.root.destroy()
+    
+    def _apply_loaded_source(self, source):
+        """Header leído: fijar la imagen fuente, su tamaño en mm y su posición"""
+        self.image_path = source.path
+        self.set_source_image(source)
+        self._load_applied = True
+        self._reset_preview(None)
 
-        width, height = self.original_image.size
-        file_size = os.path.getsize(file_path) / 1024 / 1024
-        self.info_label.config(text=f"{os.path.basename(file_path)}\n{width}x{height} px\n{file_size:.2f} MB")
+        width, height = source.size
+        self.image_transform.set_source_size(width, height)
 
         # Calcular tamaño de imagen basándose SOLO en la imagen original
         dpi = 300
@@ -541,7 +734,7 @@ class PosterPrinter:
         # Seleccionar automáticamente
         self.selected = True
 
-        self.update_preview()
+        self.request_redraw()
 
     def load_image(self):
         filetypes = [
@@ -557,10 +750,7 @@ class PosterPrinter:
         filename = filedialog.askopenfilename(title="Seleccionar imagen", filetypes=filetypes)
 
         if filename:
-            try:
-                self._process_loaded_image(filename)
-            except Exception as e:
-                messagebox.showerror("Error", f"No se pudo cargar la imagen:\n{str(e)}")
+            self.start_image_load(filename)
     
     def setup_drag_drop(self):
         """Configurar drag & drop en toda la ventana"""
@@ -602,194 +792,304 @@ class PosterPrinter:
                                f"JPG, PNG, BMP, GIF, TIFF, WebP")
             return
         
-        # Cargar la imagen
-        try:
-            self._process_loaded_image(file_path)
-
-            # Feedback visual de éxito
-            self.drop_frame.config(bg='#c8e6c9')  # Verde claro
-            self.root.after(1000, lambda: self.drop_frame.config(bg='#f0f0f0'))
-
-        except Exception as e:
-            messagebox.showerror("Error", f"No se pudo cargar la imagen:\n{str(e)}")
+        # Cargar la imagen (en segundo plano; cancela cualquier carga anterior)
+        self.start_image_load(file_path, on_success=self._flash_drop_success)
+    
+    def _flash_drop_success(self):
+        """Feedback visual de éxito"""
+        self.drop_frame.config(bg='#c8e6c9')  # Verde claro
+        self.root.after(1000, lambda: self.drop_frame.config(bg='#f0f0f0'))
     
     def change_orientation(self, orient):
         self.orientation = orient
-        self.update_preview()
+        self.request_redraw()
     
     def rotate_90(self):
         current = self.rotation_angle.get()
         self.rotation_angle.set((current + 90) % 360)
     
     def center_image(self):
+        """Centrar la imagen en la zona visible (el espacio de trabajo no tiene centro fijo)"""
+        vx0, vy0, vx1, vy1 = self.scene.visible_region()
+        self.img_x = max(0, self.px_to_mm((vx0 + vx1) / 2) - self.img_width / 2)
+        self.img_y = max(0, self.px_to_mm((vy0 + vy1) / 2) - self.img_height / 2)
+        self.request_redraw()
+    
+    def on_canvas_xview(self, *args):
+        """Scroll horizontal: dibujar incrementalmente los tiles recién expuestos"""
+        self.canvas.xview(*args)
+        self.request_redraw()
+    
+    def on_canvas_yview(self, *args):
+        """Scroll vertical: dibujar incrementalmente los tiles recién expuestos"""
+        self.canvas.yview(*args)
+        self.request_redraw()
+    
+    def on_rotation_var_change(self):
+        """La rotación cambió (slider o botón 90°): actualizar etiqueta y geometría"""
+        angle = self.rotation_angle.get()
+        self.rotation_label.config(text=f"{angle}°")
+        if self.image_transform.set_rotation(angle):
+            self.request_redraw()
+    
+    def on_rotation_change(self, value):
+        self.begin_interaction()
+        self.request_redraw()
+    
+    def on_zoom_change(self, value):
+        self.display_scale = float(value)
+        self.begin_interaction()
+        self.request_redraw()
+    
+    def get_workspace_extent(self):
+        """
+        (filas, columnas) del espacio de trabajo virtual: las hojas ocupadas por la
+        imagen más un margen, y al menos lo que hoy se ve para que el scroll no salte.
+        """
         paper_w, paper_h = self.get_paper_size_mm()
         overlap = self.overlap_mm.get()
         effective_w = paper_w - overlap
         effective_h = paper_h - overlap
-        workspace_w = effective_w * self.workspace_cols / 2
-        workspace_h = effective_h * self.workspace_rows / 2
-        self.img_x = workspace_w - self.img_width / 2
-        self.img_y = workspace_h - self.img_height / 2
-        self.update_preview()
-    
-    def on_zoom_change(self, value):
-        self.display_scale = float(value)
-        self.update_preview()
+        
+        rows = cols = self.WORKSPACE_MIN_PAGES
+        
+        layout = self.get_tile_layout()
+        if layout.pages:
+            rows = max(rows, layout.max_row + 1 + self.WORKSPACE_MARGIN_PAGES)
+            cols = max(cols, layout.max_col + 1 + self.WORKSPACE_MARGIN_PAGES)
+        
+        _, _, vx1, vy1 = self.scene.visible_region()
+        rows = max(rows, math.ceil(self.px_to_mm(vy1) / effective_h))
+        cols = max(cols, math.ceil(self.px_to_mm(vx1) / effective_w))
+        return rows, cols
     
     def draw_grid(self):
-        self.canvas.delete("all")
-
+        """Sincronizar la cuadrícula retenida y el scroll region con papel/solapado/zoom"""
         paper_w, paper_h = self.get_paper_size_mm()
         overlap = self.overlap_mm.get()
         effective_w = paper_w - overlap
         effective_h = paper_h - overlap
+        
+        # Espacio de trabajo disperso: crece con la imagen, sin máximo fijo de hojas
+        self.workspace_rows, self.workspace_cols = self.get_workspace_extent()
 
-        # Dibujar cuadrícula de páginas (paso = effective, tamaño = paper)
-        for row in range(self.workspace_rows):
-            for col in range(self.workspace_cols):
-                x1 = self.mm_to_px(col * effective_w)
-                y1 = self.mm_to_px(row * effective_h)
-                x2 = self.mm_to_px(col * effective_w + paper_w)
-                y2 = self.mm_to_px(row * effective_h + paper_h)
-
-                self.canvas.create_rectangle(x1, y1, x2, y2, outline='#ccc', width=1)
+        # Solo los tiles dentro de la vista (+ margen); se reubican si cambió la geometría
+        row_range, col_range = self.scene.visible_tiles(
+            self.scene.visible_region(self.VIEWPORT_MARGIN_PX), paper_w, paper_h, overlap,
+            self.display_scale, self.workspace_rows, self.workspace_cols)
+        self.scene.sync_grid(row_range, col_range, paper_w, paper_h, overlap, self.display_scale)
 
         # Configurar scroll region
         total_w = self.mm_to_px(effective_w * self.workspace_cols + overlap)
         total_h = self.mm_to_px(effective_h * self.workspace_rows + overlap)
-        self.canvas.configure(scrollregion=(0, 0, total_w, total_h))
+        self.scene.set_scroll_region(total_w, total_h)
+    
+    def get_output_dpi(self):
+        """(DPI de salida, DPI efectivo de la fuente) para el tamaño actual de la imagen"""
+        effective = self.image_transform.effective_dpi(self.img_width)
+        return self.image_transform.output_dpi(self.img_width, self.max_output_dpi.get()), effective
+    
+    def get_dpi_text(self):
+        if self.source_image is None or self.image_transform.source_size is None:
+            return "Salida: -"
+        dpi, effective = self.get_output_dpi()
+        return f"Salida: {dpi} DPI (fuente: {effective:.0f} DPI)"
     
     def update_preview(self):
-        self.canvas.delete("all")
+        frame_start = time.perf_counter()
         
-        paper_w, paper_h = self.get_paper_size_mm()
-        overlap = self.overlap_mm.get()
+        # Páginas que realmente tienen imagen (basado en rectángulo de selección)
+        layout = self.get_tile_layout()
+        pages_text = f"Páginas: {layout.cols}x{layout.rows} = {len(layout)} hojas"
         
-        # Obtener páginas que realmente tienen imagen (basado en rectángulo de selección)
-        pages_with_image = []
-        if self.original_image is not None:
-            pages_with_image = self.get_pages_with_image()
-            total_pages = len(pages_with_image)
-            
-            # Calcular dimensiones para mostrar
-            if pages_with_image:
-                cols = max(p[1] for p in pages_with_image) - min(p[1] for p in pages_with_image) + 1
-                rows = max(p[0] for p in pages_with_image) - min(p[0] for p in pages_with_image) + 1
-            else:
-                cols = rows = 0
-            
-            self.pages_label.config(text=f"Páginas: {cols}x{rows} = {total_pages} hojas")
-        else:
-            self.pages_label.config(text="Páginas: 0x0 = 0 hojas")
+        if pages_text != self._pages_text:
+            self.pages_label.config(text=pages_text)
+            self._pages_text = pages_text
         
-        # Dibujar cuadrícula de páginas (paso = effective, tamaño = paper)
-        effective_w = paper_w - overlap
-        effective_h = paper_h - overlap
-        for row in range(self.workspace_rows):
-            for col in range(self.workspace_cols):
-                x1 = self.mm_to_px(col * effective_w)
-                y1 = self.mm_to_px(row * effective_h)
-                x2 = self.mm_to_px(col * effective_w + paper_w)
-                y2 = self.mm_to_px(row * effective_h + paper_h)
-
-                # Resaltar SOLO páginas que tienen imagen
-                if (row, col) in pages_with_image:
-                    self.canvas.create_rectangle(x1, y1, x2, y2, outline='#0066cc', width=2, fill='#e6f2ff', tags='grid')
-                    # Numerar solo las páginas con imagen
-                    page_num = pages_with_image.index((row, col)) + 1
-                    self.canvas.create_text(x1 + 15, y1 + 15, text=str(page_num),
-                                          font=self.font_manager.get_font(14, 'bold'), fill='#0066cc', tags='grid')
-                else:
-                    self.canvas.create_rectangle(x1, y1, x2, y2, outline='#ccc', width=1, tags='grid')
+        dpi_text = self.get_dpi_text()
+        if dpi_text != self._dpi_text:
+            self.dpi_label.config(text=dpi_text)
+            self._dpi_text = dpi_text
+        
+        self.draw_grid()
+        
+        # Resaltar y numerar SOLO páginas que tienen imagen (solo cambia lo que difiere)
+        self.scene.set_highlight(layout.page_numbers)
         
         # Dibujar imagen si existe
-        if self.original_image is not None:
-            # Rotar imagen
-            img = self.original_image.copy()
-            if self.rotation_angle.get() != 0:
-                img = img.rotate(-self.rotation_angle.get(), expand=True, resample=Image.BICUBIC)
+        display_w = self.mm_to_px(self.img_width)
+        display_h = self.mm_to_px(self.img_height)
+        
+        img_x_px = self.mm_to_px(self.img_x)
+        img_y_px = self.mm_to_px(self.img_y)
+        visible_box = None
+        # Mientras carga en segundo plano solo se conoce el header: se muestra la selección sin raster
+        if self.preview_pyramid is not None and display_w > 0 and display_h > 0:
+            visible_box = self.get_visible_image_box(img_x_px, img_y_px, display_w, display_h)
+        
+        if visible_box is not None:
+            frame = self.get_preview_frame(self.rotation_angle.get(), display_w, display_h,
+                                           visible_box, fast=self.interactive)
             
-            # Calcular tamaño en pixels para display
-            display_w = self.mm_to_px(self.img_width)
-            display_h = self.mm_to_px(self.img_height)
-            
-            if display_w > 0 and display_h > 0:
-                img_resized = img.resize((int(display_w), int(display_h)), Image.LANCZOS)
-                self.display_image = ImageTk.PhotoImage(img_resized)
-                
-                # Dibujar imagen
-                img_x_px = self.mm_to_px(self.img_x)
-                img_y_px = self.mm_to_px(self.img_y)
-                self.image_id = self.canvas.create_image(img_x_px, img_y_px, image=self.display_image, 
-                                                        anchor='nw', tags='image')
-            
-            # Dibujar handles de resize si está seleccionada
-            if self.selected:
-                self.draw_selection()
+            # Mover el item existente (o crearlo la primera vez); sin frame aún se deja el actual
+            if frame is not None:
+                self.display_image, (offset_x, offset_y) = frame
+                self.scene.set_image(self.display_image, img_x_px + offset_x, img_y_px + offset_y)
+        else:
+            self.scene.clear_image()
+        self.image_id = self.scene.image_item
         
-        # Configurar scroll region
-        total_w = self.mm_to_px(effective_w * self.workspace_cols + overlap)
-        total_h = self.mm_to_px(effective_h * self.workspace_rows + overlap)
-        self.canvas.configure(scrollregion=(0, 0, total_w, total_h))
+        # Dibujar handles de resize si está seleccionada
+        if self.source_image is not None and self.selected:
+            self.draw_selection()
+        else:
+            self.scene.hide_selection()
+            self.resize_handles = []
+        
+        self.scene.end_frame(frame_start)
+
+    def get_visible_image_box(self, img_x_px, img_y_px, display_w, display_h):
+        """
+        Parte de la imagen (coords locales en px de display) que cae en la vista + margen,
+        alineada a bloques para que arrastres cortos reutilicen el mismo recorte.
+        None si la imagen está completamente fuera de vista.
+        """
+        vx0, vy0, vx1, vy1 = self.scene.visible_region(self.VIEWPORT_MARGIN_PX)
+        chunk = self.IMAGE_CHUNK_PX
+
+        left = max(0, math.floor((vx0 - img_x_px) / chunk) * chunk)
+        top = max(0, math.floor((vy0 - img_y_px) / chunk) * chunk)
+        right = min(display_w, math.ceil((vx1 - img_x_px) / chunk) * chunk)
+        bottom = min(display_h, math.ceil((vy1 - img_y_px) / chunk) * chunk)
+
+        if right <= left or bottom <= top:
+            return None
+        return (left, top, right, bottom)
+
+    def get_preview_frame(self, angle, display_w, display_h, box, fast=False):
+        """
+        Obtener (PhotoImage, offset) de vista previa para (rotación, ancho, alto) en pixels,
+        recortado a box (coords locales de display) si la imagen no entra en la vista.
+        Si el raster no está en caché se pide al hilo de fondo y mientras tanto se
+        devuelve el último frame bueno escalado (o None si no hay ninguno).
+        Con fast=True (gesto en curso) se usa un proxy de menor resolución y NEAREST.
+        """
+        key = (angle, display_w, display_h, box)
+        cached = self.preview_cache.get(key)
+        if cached is None and fast:
+            key += ('fast',)
+            cached = self.preview_cache.get(key)
+        if cached is not None:
+            photo, img = cached
+            self._last_frame = (key, photo, img)
+            return photo, box[:2]
+
+        if key != self._inflight_key:
+            pyramid = self.preview_pyramid
+            self._inflight_key = key
+            self.preview_worker.submit(
+                key, lambda: pyramid.render(angle, display_w, display_h, box, fast=fast))
+
+        return self._placeholder_frame(key)
+
+    def _on_preview_rendered(self, key, img):
+        """Resultado del hilo de fondo (ya en el hilo de Tk): crear PhotoImage y redibujar"""
+        if key == self._inflight_key:
+            self._inflight_key = None
+        photo = ImageTk.PhotoImage(img)
+
+        # PhotoImage guarda su propia copia RGBA de los pixels en Tk
+        self.preview_cache.put(key, (photo, img), img.width * img.height * 4 + PreviewCache.image_nbytes(img))
+        self.request_redraw()
+
+    def _on_preview_failed(self, key, error):
+        """
+        El render de fondo falló (ya registrado por el worker): liberar el key para que
+        el próximo redibujado lo vuelva a pedir en vez de quedar en el placeholder.
+        """
+        if key == self._inflight_key:
+            self._inflight_key = None
+    
+    def _placeholder_frame(self, key):
+        """Último frame bueno escalado (NEAREST) a la geometría pedida, solo en la zona visible"""
+        if self._last_frame is None:
+            return None
+        last_key, last_photo, last_img = self._last_frame
+        angle, display_w, display_h, box = key[:4]
+        last_angle, last_w, last_h, last_box = last_key[:4]
+
+        if last_key[:4] == key[:4]:
+            return last_photo, last_box[:2]
+        if last_angle != angle:
+            return None
+
+        if self._placeholder is not None and self._placeholder[0] == key:
+            return self._placeholder[1:]
+
+        fx = display_w / last_w
+        fy = display_h / last_h
+        # Caja del frame anterior en coords de display nuevas, intersectada con la pedida
+        old_left, old_top = last_box[0] * fx, last_box[1] * fy
+        left = max(old_left, box[0])
+        top = max(old_top, box[1])
+        right = min(last_box[2] * fx, box[2])
+        bottom = min(last_box[3] * fy, box[3])
+        if right - left < 1 or bottom - top < 1:
+            return None
+
+        source_box = ((left - old_left) / fx, (top - old_top) / fy,
+                      (right - old_left) / fx, (bottom - old_top) / fy)
+        img = last_img.resize((int(right - left), int(bottom - top)), Image.NEAREST, box=source_box)
+        photo = ImageTk.PhotoImage(img)
+        self._placeholder = (key, photo, (int(left), int(top)))
+        return self._placeholder[1:]
 
     def draw_selection(self):
-        # Limpiar handles anteriores
-        for handle in self.resize_handles:
-            self.canvas.delete(handle)
-        self.resize_handles = []
-        
-        if self.selection_rect:
-            self.canvas.delete(self.selection_rect)
-        
         x1 = self.mm_to_px(self.img_x)
         y1 = self.mm_to_px(self.img_y)
         x2 = self.mm_to_px(self.img_x + self.img_width)
         y2 = self.mm_to_px(self.img_y + self.img_height)
         
-        # Rectángulo de selección más visible
-        self.selection_rect = self.canvas.create_rectangle(x1, y1, x2, y2, outline='#0066cc', width=3, dash=(5, 3), tags='selection')
-        
-        # Handles en las esquinas (dentro del rectángulo de selección)
-        handle_size = 10
-        positions = [
-            (x1, y1, 'nw', x1, y1, x1 + handle_size * 2, y1 + handle_size * 2),
-            (x2, y1, 'ne', x2 - handle_size * 2, y1, x2, y1 + handle_size * 2),
-            (x1, y2, 'sw', x1, y2 - handle_size * 2, x1 + handle_size * 2, y2),
-            (x2, y2, 'se', x2 - handle_size * 2, y2 - handle_size * 2, x2, y2),
-        ]
-
-        for cx, cy, corner, hx1, hy1, hx2, hy2 in positions:
-            handle = self.canvas.create_rectangle(
-                hx1, hy1, hx2, hy2,
-                fill='#0066cc', outline='white', width=2, tags=f'handle_{corner}'
-            )
-            self.resize_handles.append(handle)
+        # Rectángulo de selección + handles en las esquinas (se reubican, no se recrean)
+        self.scene.set_selection(x1, y1, x2, y2)
+        self.selection_rect = self.scene.selection_rect
+        self.resize_handles = list(self.scene.handles.values())
+    
+    def hit_test(self, x, y):
+        """Objetivo bajo (x, y) en px de canvas: 'handle_<corner>', 'image' o None (sin Tk)"""
+        if self.source_image is None:
+            return None
+        rect = (self.img_x, self.img_y, self.img_width, self.img_height)
+        return self.hit_tester.hit_test(self.px_to_mm(x), self.px_to_mm(y), rect,
+                                        self.display_scale, self.selected)
+    
+    def set_cursor(self, cursor):
+        """Cambiar cursor del canvas solo si es distinto al actual"""
+        if cursor != self._canvas_cursor:
+            self.canvas.config(cursor=cursor)
+            self._canvas_cursor = cursor
     
     def on_mouse_down(self, event):
         x, y = self.canvas.canvasx(event.x), self.canvas.canvasy(event.y)
+        target = self.hit_test(x, y)
+        
+        # Click en un handle
+        if target is not None and target.startswith('handle_'):
+            corner = target.split('_')[1]
+            self.drag_data = {"x": x, "y": y, "resizing": True, "handle": corner, "dragging": False}
+            return
         
-        # Verificar si hizo click en un handle
-        for handle in self.resize_handles:
-            bbox = self.canvas.bbox(handle)
-            if bbox and bbox[0] <= x <= bbox[2] and bbox[1] <= y <= bbox[3]:
-                tags = self.canvas.gettags(handle)
-                corner = tags[0].split('_')[1] if tags else None
-                self.drag_data = {"x": x, "y": y, "resizing": True, "handle": corner, "dragging": False}
-                return
-        
-        # Verificar si hizo click en la imagen
-        if self.image_id:
-            bbox = self.canvas.bbox(self.image_id)
-            if bbox and bbox[0] <= x <= bbox[2] and bbox[1] <= y <= bbox[3]:
-                self.selected = True
-                self.drag_data = {"x": x, "y": y, "dragging": True, "resizing": False, "handle": None}
-                self.update_preview()
-                return
+        # Click en la imagen
+        if target == 'image':
+            self.selected = True
+            self.drag_data = {"x": x, "y": y, "dragging": True, "resizing": False, "handle": None}
+            self.request_redraw()
+            return
         
         # Click fuera de la imagen
         self.selected = False
         self.drag_data = {"x": 0, "y": 0, "dragging": False, "resizing": False, "handle": None}
-        self.update_preview()
+        self.request_redraw()
     
     
     def on_mouse_drag(self, event):
@@ -802,12 +1102,9 @@ class PosterPrinter:
             
             corner = self.drag_data["handle"]
             
-            # Calcular proporción original
-            if self.original_image:
-                img = self.original_image.copy()
-                if self.rotation_angle.get() != 0:
-                    img = img.rotate(-self.rotation_angle.get(), expand=True, resample=Image.BICUBIC)
-                aspect_ratio = img.height / img.width
+            # Proporción de la imagen rotada (geometría cacheada, sin rotar pixels)
+            if self.source_image:
+                aspect_ratio = self.image_transform.aspect_ratio
             else:
                 aspect_ratio = self.img_height / self.img_width
             
@@ -841,7 +1138,8 @@ class PosterPrinter:
             
             self.drag_data["x"] = x
             self.drag_data["y"] = y
-            self.update_preview()
+            self.begin_interaction()
+            self.request_redraw()
             
         elif self.drag_data["dragging"]:
             # Move
@@ -853,7 +1151,8 @@ class PosterPrinter:
             
             self.drag_data["x"] = x
             self.drag_data["y"] = y
-            self.update_preview()
+            self.begin_interaction()
+            self.request_redraw()
     
     def on_mouse_up(self, event):
         self.drag_data = {"x": 0, "y": 0, "dragging": False, "resizing": False, "handle": None}
@@ -863,26 +1162,17 @@ class PosterPrinter:
             return
         
         x, y = self.canvas.canvasx(event.x), self.canvas.canvasy(event.y)
+        target = self.hit_test(x, y)
         
         # Cambiar cursor según posición
-        for handle in self.resize_handles:
-            bbox = self.canvas.bbox(handle)
-            if bbox and bbox[0] <= x <= bbox[2] and bbox[1] <= y <= bbox[3]:
-                tags = self.canvas.gettags(handle)
-                corner = tags[0].split('_')[1] if tags else None
-                if corner in ['nw', 'se']:
-                    self.canvas.config(cursor='size_nw_se')
-                elif corner in ['ne', 'sw']:
-                    self.canvas.config(cursor='size_ne_sw')
-                return
-        
-        if self.image_id:
-            bbox = self.canvas.bbox(self.image_id)
-            if bbox and bbox[0] <= x <= bbox[2] and bbox[1] <= y <= bbox[3]:
-                self.canvas.config(cursor='fleur')
-                return
-        
-        self.canvas.config(cursor='arrow')
+        if target in ('handle_nw', 'handle_se'):
+            self.set_cursor('size_nw_se')
+        elif target in ('handle_ne', 'handle_sw'):
+            self.set_cursor('size_ne_sw')
+        elif target == 'image':
+            self.set_cursor('fleur')
+        else:
+            self.set_cursor('arrow')
     
     def on_mousewheel(self, event):
         if event.delta > 0:
@@ -890,24 +1180,16 @@ class PosterPrinter:
         else:
             new_scale = max(0.5, self.display_scale - 0.1)
         self.display_scale = new_scale
-        self.update_preview()
+        self.begin_interaction()
+        self.request_redraw()
     
-    def print_poster(self):
-        """Abrir diálogo de impresión modular"""
-        if self.original_image is None:
-            messagebox.showwarning("Advertencia", "Por favor carga una imagen primero")
-            return
-        
-        # Preparar datos para el diálogo
+    def get_job_data(self):
+        """Estado actual para el motor de salida (PosterJob) y el diálogo de impresión"""
         paper_w, paper_h = self.get_paper_size_mm()
-        pages_with_image = self.get_pages_with_image()
-        
-        if not pages_with_image:
-            messagebox.showwarning("Advertencia", "No hay páginas con imagen para imprimir")
-            return
-        
-        app_data = {
-            'original_image': self.original_image,
+        layout = self.get_tile_layout()
+        return {
+            'source_image': self.source_image,
+            'image_transform': self.image_transform,
             'rotation_angle': self.rotation_angle.get(),
             'orientation': self.orientation,
             'paper_w_mm': paper_w,
@@ -917,15 +1199,34 @@ class PosterPrinter:
             'img_y': self.img_y,
             'img_width': self.img_width,
             'img_height': self.img_height,
-            'pages_with_image': pages_with_image,
+            'pages_with_image': layout.pages,
+            'tile_layout': layout,
             'show_page_numbers': self.show_page_numbers.get(),
+            'bleed_mode': self.bleed_mode.get(),
+            'bleed_direction': self.bleed_direction.get(),
+            'max_output_dpi': self.max_output_dpi.get(),
+            'pdf_compression': self.pdf_compression.get(),
+            'jpeg_quality': self.jpeg_quality.get(),
             'font_manager': self.font_manager,
         }
+    
+    def print_poster(self):
+        """Abrir diálogo de impresión modular"""
+        if self.source_image is None:
+            messagebox.showwarning("Advertencia", "Por favor carga una imagen primero")
+            return
+        
+        # Preparar datos para el diálogo
+        app_data = self.get_job_data()
+        
+        if not app_data['pages_with_image']:
+            messagebox.showwarning("Advertencia", "No hay páginas con imagen para imprimir")
+            return
         
         show_print_dialog(self.root, app_data)
     
     def export_pdf(self):
-        if self.original_image is None:
+        if self.source_image is None:
             messagebox.showwarning("Advertencia", "Por favor carga una imagen primero")
             return
         
@@ -933,159 +1234,30 @@ class PosterPrinter:
         
         if filename:
             try:
-                from reportlab.pdfgen import canvas as pdf_canvas
-                from reportlab.lib.pagesizes import A4, landscape
-                from reportlab.lib.units import mm
-                
-                paper_w, paper_h = self.get_paper_size_mm()
-                
-                if self.orientation == 'horizontal':
-                    page_size = landscape((paper_w * mm, paper_h * mm))
-                else:
-                    page_size = (paper_w * mm, paper_h * mm)
-                
-                overlap = self.overlap_mm.get()
-                bleed_mode = self.bleed_mode.get()
-                bleed_dir = self.bleed_direction.get()
+                # Mismo motor que los modos de impresión (geometría, sangrado y PDF)
+                job = PosterJob.from_app_data(self.get_job_data())
                 
-                # Preparar imagen - NO rotar aquí, mantener original
-                img = self.original_image.copy()
-                if self.rotation_angle.get() != 0:
-                    img = img.rotate(-self.rotation_angle.get(), expand=True, resample=Image.BICUBIC)
-                
-                # NO rotar por orientación - mantener dimensiones originales
-                actual_img_w_mm = self.img_width
-                actual_img_h_mm = self.img_height
-                
-                # Calcular proporción actual
-                aspect_ratio = img.height / img.width
-                
-                # Escalar imagen según el tamaño establecido
-                dpi = 300
-                target_width_px = int((actual_img_w_mm / 25.4) * dpi)
-                target_height_px = int(target_width_px * aspect_ratio)
-                
-                img = img.resize((target_width_px, target_height_px), Image.LANCZOS)
-                
-                # Guardar imagen temporalmente
-                temp_img_file = tempfile.NamedTemporaryFile(delete=False, suffix='.png')
-                temp_img_path = temp_img_file.name
-                temp_img_file.close()
-                img.save(temp_img_path)
-                
-                effective_w = paper_w - overlap
-                effective_h = paper_h - overlap
-                
-                # Obtener solo páginas que tienen imagen
-                pages_with_image = self.get_pages_with_image()
-                
-                if not pages_with_image:
+                if not job.pages:
                     messagebox.showwarning("Advertencia", "No hay páginas con imagen para exportar")
                     return
                 
-                total_pages = len(pages_with_image)
-                
-                c = pdf_canvas.Canvas(filename, pagesize=page_size)
-                
-                for page_idx, (row, col) in enumerate(pages_with_image):
-                    page_num = page_idx + 1
-                    
-                    # Calcular offset de esta página
-                    page_left_mm = col * effective_w
-                    page_top_mm = row * effective_h
-                    
-                    # Determinar posición en la matriz de páginas con imagen
-                    min_col = min(p[1] for p in pages_with_image)
-                    min_row = min(p[0] for p in pages_with_image)
-                    max_col = max(p[1] for p in pages_with_image)
-                    max_row = max(p[0] for p in pages_with_image)
-                    
-                    # Calcular área visible de esta página según modo sangrado
-                    if bleed_mode:
-                        # Determinar si tiene borde en cada lado
-                        is_first_col = (col == min_col)
-                        is_last_col = (col == max_col)
-                        is_first_row = (row == min_row)
-                        is_last_row = (row == max_row)
-                        
-                        if bleed_dir == 'left':
-                            bleed_left = 0 if is_first_col else overlap
-                            bleed_right = 0
-                            bleed_top = 0 if is_first_row else overlap
-                            bleed_bottom = 0
-                        else:
-                            bleed_left = 0
-                            bleed_right = 0 if is_last_col else overlap
-                            bleed_top = 0
-                            bleed_bottom = 0 if is_last_row else overlap
-                        
-                        # Ajustar área de dibujo
-                        draw_x = bleed_left * mm
-                        draw_y = bleed_bottom * mm
-                        draw_width = (paper_w - bleed_left - bleed_right) * mm
-                        draw_height = (paper_h - bleed_top - bleed_bottom) * mm
-                        
-                        # Posición de la imagen considerando el sangrado
-                        img_offset_x = (self.img_x - page_left_mm + bleed_left)
-                        img_offset_y = (self.img_y - page_top_mm + bleed_bottom)
-                        
-                    else:
-                        # Modo normal (sin sangrado)
-                        draw_x = 0
-                        draw_y = 0
-                        draw_width = paper_w * mm
-                        draw_height = paper_h * mm
-                        img_offset_x = self.img_x - page_left_mm
-                        img_offset_y = self.img_y - page_top_mm
-                    
-                    # Dibujar imagen (invertir Y para PDF)
-                    c.drawImage(temp_img_path,
-                              draw_x + (img_offset_x - (bleed_left if bleed_mode else 0)) * mm,
-                              page_size[1] - draw_y - (img_offset_y - (bleed_bottom if bleed_mode else 0)) * mm - actual_img_h_mm * mm,
-                              width=actual_img_w_mm * mm,
-                              height=actual_img_h_mm * mm)
-                    
-                    # Añadir número de página si está activado
-                    if self.show_page_numbers.get():
-                        c.setFillColorRGB(0.2, 0.2, 0.2)
-                        c.setFont("Helvetica-Bold", 12)
-                        c.drawString(10 * mm, page_size[1] - 10 * mm, str(page_num))
-                    
-                    # Dibujar indicador de borde de sangrado
-                    if bleed_mode:
-                        c.setStrokeColorRGB(1, 0, 0)
-                        c.setLineWidth(0.5)
-                        if bleed_dir == 'left':
-                            if not is_first_col:
-                                c.line(bleed_left * mm, 0, bleed_left * mm, page_size[1])
-                            if not is_first_row:
-                                c.line(0, page_size[1] - bleed_top * mm, page_size[0], page_size[1] - bleed_top * mm)
-                        else:
-                            if not is_last_col:
-                                c.line(page_size[0] - bleed_right * mm, 0, page_size[0] - bleed_right * mm, page_size[1])
-                            if not is_last_row:
-                                c.line(0, bleed_bottom * mm, page_size[0], bleed_bottom * mm)
-                    
-                    c.showPage()
-                
-                c.save()
-                
-                # Limpiar archivo temporal
-                if os.path.exists(temp_img_path):
-                    os.remove(temp_img_path)
+                job.write_pdf(filename)
                 
                 bleed_info = ""
-                if bleed_mode:
-                    bleed_info = f"\n\nModo sangrado: {'Izquierda/Arriba' if bleed_dir == 'left' else 'Derecha/Abajo'}"
+                if job.bleed_mode:
+                    bleed_info = f"\n\nModo sangrado: {'Izquierda/Arriba' if job.bleed_direction == 'left' else 'Derecha/Abajo'}"
                 
-                messagebox.showinfo("Éxito", f"PDF exportado exitosamente:\n{filename}{bleed_info}")
+                dpi_info = f"\n\nResolución: {job.dpi} DPI (fuente: {job.effective_dpi:.0f} DPI)"
+                size_info = (f"\nCompresión: {job.compression.describe()}"
+                             f"\nTamaño: {os.path.getsize(filename) / (1024 * 1024):.1f} MB")
+                
+                messagebox.showinfo("Éxito", f"PDF exportado exitosamente:\n{filename}{dpi_info}{size_info}{bleed_info}")
                 
             except ImportError:
                 messagebox.showerror("Error", "Falta la librería 'reportlab'.\nInstálala con: pip install reportlab")
             except Exception as e:
                 messagebox.showerror("Error", f"No se pudo exportar el PDF:\n{str(e)}")
 
-
 if __name__ == "__main__":
     if DND_AVAILABLE:
         root = TkinterDnD.Tk()
@@ -0,0 +1,147 @@
+from collections import OrderedDict
+from PIL import Image
+from geometry import rotated_size
+
+
+# Rotaciones exactas: Image.rotate(-angle, expand=True) para múltiplos de 90°
+QUARTER_TURNS = {90: Image.ROTATE_270, 180: Image.ROTATE_180, 270: Image.ROTATE_90}
+
+
+def rotate_image(img, angle, resample=Image.BICUBIC):
+    """
+    Rotar en sentido horario (convención de la UI) con expand. Los múltiplos de 90°
+    se hacen con transpose: sin interpolar y mucho más rápido que rotate.
+    """
+    angle = angle % 360
+    if angle == 0:
+        return img
+    if angle in QUARTER_TURNS:
+        return img.transpose(QUARTER_TURNS[angle])
+    return img.rotate(-angle, expand=True, resample=resample)
+
+
+class PreviewCache:
+    """Caché LRU de rasters de vista previa con límite de memoria"""
+
+    def __init__(self, max_bytes=256 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> (value, nbytes)
+
+    @staticmethod
+    def image_nbytes(img):
+        """Estimar memoria ocupada por una imagen PIL (bytes)"""
+        return img.width * img.height * len(img.getbands())
+
+    def get(self, key):
+        """Obtener entrada y marcarla como usada recientemente (None si no existe)"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def put(self, key, value, nbytes):
+        """Guardar entrada y desalojar las menos usadas si se supera el límite"""
+        if key in self._entries:
+            self.current_bytes -= self._entries.pop(key)[1]
+
+        # Una entrada más grande que el límite no se cachea
+        if nbytes > self.max_bytes:
+            return
+
+        self._entries[key] = (value, nbytes)
+        self.current_bytes += nbytes
+
+        while self.current_bytes > self.max_bytes and self._entries:
+            _, (_, evicted_bytes) = self._entries.popitem(last=False)
+            self.current_bytes -= evicted_bytes
+
+    def clear(self):
+        """Vaciar caché (p. ej. al cargar otra imagen)"""
+        self._entries.clear()
+        self.current_bytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+
+class PreviewPyramid:
+    """
+    Pirámide de resoluciones (1, 1/2, 1/4, 1/8) construida una vez por imagen.
+    Las variantes rotadas se generan bajo demanda y se cachean por nivel.
+    """
+
+    REDUCTIONS = 3  # Niveles extra: 1/2, 1/4, 1/8
+
+    def __init__(self, image, rotated_max_bytes=192 * 1024 * 1024):
+        self.levels = [image]
+        for _ in range(self.REDUCTIONS):
+            prev = self.levels[-1]
+            if prev.width < 2 or prev.height < 2:
+                break
+            self.levels.append(prev.reduce(2))
+
+        self._rotated = PreviewCache(max_bytes=rotated_max_bytes)
+
+    @classmethod
+    def from_levels(cls, levels, rotated_max_bytes=192 * 1024 * 1024):
+        """Pirámide a partir de niveles ya reducidos (p. ej. leídos de la caché en disco)"""
+        pyramid = cls.__new__(cls)
+        pyramid.levels = list(levels)
+        pyramid._rotated = PreviewCache(max_bytes=rotated_max_bytes)
+        return pyramid
+
+    def rotated(self, level_index, angle, resample=Image.BICUBIC):
+        """Nivel rotado (se cachea para reutilizar en zoom y arrastre)"""
+        level = self.levels[level_index]
+        if angle % 360 == 0:
+            return level
+
+        key = (level_index, angle, resample)
+        img = self._rotated.get(key)
+        if img is None:
+            img = rotate_image(level, angle, resample)
+            self._rotated.put(key, img, PreviewCache.image_nbytes(img))
+        return img
+
+    def source_for(self, angle, target_w, target_h, fast=False):
+        """
+        Nivel más pequeño cuyo tamaño rotado sigue siendo >= al tamaño destino,
+        para que el resize final siempre reduzca (nunca amplíe) un nivel reducido.
+        En modo rápido (durante un gesto) alcanza con la mitad del tamaño destino
+        y la rotación usa NEAREST: es un proxy que luego se reemplaza en alta calidad.
+        """
+        if fast:
+            target_w /= 2
+            target_h /= 2
+
+        chosen = 0
+        for index in range(len(self.levels) - 1, -1, -1):
+            level = self.levels[index]
+            rot_w, rot_h = rotated_size(level.width, level.height, angle)
+            if rot_w >= target_w and rot_h >= target_h:
+                chosen = index
+                break
+        return self.rotated(chosen, angle, Image.NEAREST if fast else Image.BICUBIC)
+
+    def render(self, angle, display_w, display_h, box, fast=False):
+        """
+        Raster de vista previa de display_w x display_h px recortado a box
+        (coords locales de display). No toca Tk: puede ejecutarse en un hilo.
+        """
+        img = self.source_for(angle, display_w, display_h, fast=fast)
+
+        # Re-muestrear solo la región visible del nivel elegido
+        sx = img.width / display_w
+        sy = img.height / display_h
+        source_box = (box[0] * sx, box[1] * sy, box[2] * sx, box[3] * sy)
+        size = (box[2] - box[0], box[3] - box[1])
+        return img.resize(size, Image.NEAREST if fast else Image.LANCZOS, box=source_box)
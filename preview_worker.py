@@ -0,0 +1,106 @@
+import queue
+import threading
+import traceback
+
+
+class PreviewWorker:
+    """
+    Hilo de fondo para el re-muestreo de la vista previa.
+    Cada pedido lleva un número de generación: un pedido nuevo reemplaza al que
+    aún no empezó, y los resultados de generaciones viejas se descartan.
+    Los resultados vuelven al hilo de Tk por polling con after (Tk no es thread-safe).
+    Si fn() lanza una excepción se registra y se entrega on_error(key, excepción)
+    en el hilo de Tk, para que quien pidió el render no quede esperando ese key.
+    """
+
+    def __init__(self, widget, on_result, on_error=None, poll_ms=15):
+        self.widget = widget
+        self.on_result = on_result
+        self.on_error = on_error
+        self.poll_ms = poll_ms
+
+        self.generation = 0
+        self.stats = {'submitted': 0, 'completed': 0, 'discarded': 0, 'failed': 0}
+
+        self._cond = threading.Condition()
+        self._pending = None      # (generation, key, fn) aún no iniciado
+        self._busy = False
+        self._results = queue.Queue()
+        self._poll_job = None
+
+        self._thread = threading.Thread(target=self._loop, name="PreviewWorker", daemon=True)
+        self._thread.start()
+
+    def submit(self, key, fn):
+        """Agendar fn() en el hilo; reemplaza cualquier pedido pendiente. Devuelve la generación"""
+        with self._cond:
+            self.generation += 1
+            if self._pending is not None:
+                self.stats['discarded'] += 1
+            self._pending = (self.generation, key, fn)
+            self.stats['submitted'] += 1
+            self._cond.notify()
+            generation = self.generation
+        self._ensure_polling()
+        return generation
+
+    def cancel(self):
+        """Invalidar todo lo pendiente o en curso (p. ej. al cargar otra imagen)"""
+        with self._cond:
+            self.generation += 1
+            if self._pending is not None:
+                self.stats['discarded'] += 1
+            self._pending = None
+
+    def _loop(self):
+        while True:
+            with self._cond:
+                while self._pending is None:
+                    self._cond.wait()
+                generation, key, fn = self._pending
+                self._pending = None
+                self._busy = True
+
+            error = None
+            try:
+                result = fn()
+            except Exception as e:
+                print(f"Error renderizando la vista previa {key}:")
+                traceback.print_exc()
+                result = None
+                error = e
+
+            # Publicar antes de liberar _busy para que el polling no se detenga antes de verlo
+            with self._cond:
+                if generation != self.generation or (result is None and error is None):
+                    self.stats['discarded'] += 1
+                else:
+                    self._results.put((generation, key, result, error))
+                self._busy = False
+
+    def _ensure_polling(self):
+        if self._poll_job is None:
+            self._poll_job = self.widget.after(self.poll_ms, self._poll)
+
+    def _poll(self):
+        """Entregar resultados vigentes en el hilo principal"""
+        self._poll_job = None
+        while True:
+            try:
+                generation, key, result, error = self._results.get_nowait()
+            except queue.Empty:
+                break
+            if generation != self.generation:
+                self.stats['discarded'] += 1
+            elif error is not None:
+                self.stats['failed'] += 1
+                if self.on_error is not None:
+                    self.on_error(key, error)
+            else:
+                self.stats['completed'] += 1
+                self.on_result(key, result)
+
+        with self._cond:
+            outstanding = self._busy or self._pending is not None
+        if outstanding or not self._results.empty():
+            self._ensure_polling()
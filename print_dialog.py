@@ -1,6 +1,6 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-from PIL import Image, ImageDraw, ImageFont
+from PIL import Image
 import win32print
 import win32ui
 import win32api
@@ -10,6 +10,7 @@ import tempfile
 import subprocess
 import re
 import atexit
+from poster_engine import PosterJob
 
 
 class PrintDialog:
@@ -18,18 +19,27 @@ class PrintDialog:
     def __init__(self, parent, app_data):
         """
         app_data debe contener:
-        - original_image: PIL.Image
+        - source_image: SourceImage (el motor lee solo las regiones de cada hoja vía read_region/TiledRaster)
+        - image_transform: ImageTransform (geometría rotada cacheada)
         - rotation_angle: int
         - orientation: str ('vertical' o 'horizontal')
         - paper_w_mm, paper_h_mm: float
         - overlap_mm: float
         - img_x, img_y, img_width, img_height: float (mm)
         - pages_with_image: list de (row, col)
+        - tile_layout: TileLayout (páginas indexadas, filas/columnas, rects en mm)
         - show_page_numbers: bool
+        - bleed_mode: bool, bleed_direction: str ('left' o 'right')
+        - max_output_dpi: int (techo de resolución de salida)
+        - pdf_compression: str ('auto', 'jpeg' o 'flate'), jpeg_quality: int
         - font_manager: FontManager instance
         """
         self.parent = parent
         self.app_data = app_data
+        # Motor de salida compartido con Exportar PDF (geometría, sangrado, raster y PDF)
+        self.job = PosterJob.from_app_data(app_data)
+        # Perfil de compresión elegido en la ventana principal; "Calidad" lo ajusta
+        self.base_compression = self.job.compression
         
         self.dialog = tk.Toplevel(parent)
         self.dialog.title("Imprimir Poster")
@@ -86,17 +96,17 @@ class PrintDialog:
         ttk.Label(header_frame, text="🖨 Configuración de Impresión", font=title_font).pack(pady=(0, 5))
         
         # Info de páginas
-        total_pages = len(self.app_data['pages_with_image'])
-        if total_pages > 0:
-            cols = max(p[1] for p in self.app_data['pages_with_image']) - min(p[1] for p in self.app_data['pages_with_image']) + 1
-            rows = max(p[0] for p in self.app_data['pages_with_image']) - min(p[0] for p in self.app_data['pages_with_image']) + 1
-        else:
-            cols = rows = 0
+        layout = self.app_data['tile_layout']
+        total_pages = len(layout)
+        cols, rows = layout.cols, layout.rows
         
         info_font = self.app_data['font_manager'].get_font(11, 'bold')
         ttk.Label(header_frame, text=f"Páginas: {cols}×{rows} = {total_pages} hojas", 
                  font=info_font, foreground='#0066cc').pack(pady=(0, 5))
         
+        ttk.Label(header_frame, text=f"Resolución de salida: {self.job.dpi} DPI (fuente: {self.job.effective_dpi:.0f} DPI)",
+                 font=self.app_data['font_manager'].get_font(9), foreground='gray').pack(pady=(0, 5))
+        
         ttk.Separator(header_frame, orient='horizontal').pack(fill='x')
         
         # ==================== CONTENIDO SCROLLEABLE ====================
@@ -159,6 +169,23 @@ class PrintDialog:
         
         ttk.Separator(content_inner, orient='horizontal').pack(fill='x', pady=8)
         
+        # --- CALIDAD (todos los motores) ---
+        quality_frame = ttk.Frame(content_inner)
+        quality_frame.pack(fill='x', pady=(0, 3))
+        ttk.Label(quality_frame, text="Calidad:", font=label_font).pack(side='left', padx=(0, 10))
+        ttk.Radiobutton(quality_frame, text="Borrador", value="draft", 
+                       variable=self.quality).pack(side='left', padx=5)
+        ttk.Radiobutton(quality_frame, text="Normal", value="normal", 
+                       variable=self.quality).pack(side='left', padx=5)
+        ttk.Radiobutton(quality_frame, text="Alta", value="high", 
+                       variable=self.quality).pack(side='left', padx=5)
+        ttk.Label(content_inner, text=f"PDF: compresión {self.base_compression.describe()}. "
+                                      f"Borrador: JPEG 60 / mitad de DPI en motor interno. Alta: JPEG 95.",
+                 font=self.app_data['font_manager'].get_font(8), foreground='gray',
+                 wraplength=580).pack(anchor='w', pady=(0, 3))
+        
+        ttk.Separator(content_inner, orient='horizontal').pack(fill='x', pady=8)
+        
         # --- MOTOR DE IMPRESIÓN ---
         ttk.Label(content_inner, text="Motor de Impresión:", font=label_font).pack(anchor='w', pady=(3, 3))
         
@@ -177,17 +204,6 @@ class PrintDialog:
         internal_opts = ttk.Frame(internal_frame, padding=(25, 3, 0, 0))
         internal_opts.pack(fill='x')
         
-        quality_frame = ttk.Frame(internal_opts)
-        quality_frame.pack(fill='x', pady=2)
-        ttk.Label(quality_frame, text="Calidad:", 
-                 font=self.app_data['font_manager'].get_font(9)).pack(side='left', padx=(0, 10))
-        ttk.Radiobutton(quality_frame, text="Borrador", value="draft", 
-                       variable=self.quality).pack(side='left', padx=5)
-        ttk.Radiobutton(quality_frame, text="Normal", value="normal", 
-                       variable=self.quality).pack(side='left', padx=5)
-        ttk.Radiobutton(quality_frame, text="Alta", value="high", 
-                       variable=self.quality).pack(side='left', padx=5)
-        
         # Reimprimir tiles específicos
         reprint_check = ttk.Checkbutton(internal_opts, text="⚙ Reimprimir tiles específicos", 
                                        variable=self.enable_reprint,
@@ -304,6 +320,8 @@ class PrintDialog:
     def print_internal(self):
         """Motor interno - tiles individuales con tolerancia a fallos"""
         try:
+            job = self.job
+            
             # Determinar tiles a imprimir
             total_pages = len(self.app_data['pages_with_image'])
             
@@ -316,19 +334,8 @@ class PrintDialog:
             else:
                 pages_to_print = self.app_data['pages_with_image']
             
-            # Preparar imagen
-            img_to_print = self.app_data['original_image'].copy()
-            if self.app_data['rotation_angle'] != 0:
-                img_to_print = img_to_print.rotate(-self.app_data['rotation_angle'], 
-                                                   expand=True, resample=Image.BICUBIC)
-            
-            scale_factor = self.app_data['img_width'] / img_to_print.width
-            
-            paper_w = self.app_data['paper_w_mm']
-            paper_h = self.app_data['paper_h_mm']
-            overlap = self.app_data['overlap_mm']
-            effective_w = paper_w - overlap
-            effective_h = paper_h - overlap
+            # Ajustar calidad: el borrador se renderiza a la mitad de resolución
+            dpi = max(1, job.dpi // 2) if self.quality.get() == "draft" else job.dpi
             
             # Abrir impresora
             hprinter = win32print.OpenPrinter(self.selected_printer)
@@ -336,7 +343,13 @@ class PrintDialog:
             try:
                 total_to_print = len(pages_to_print)
                 
-                for idx, (row, col) in enumerate(pages_to_print):
+                # Rotar si horizontal (transpose exacto, equivale a rotate(-90, expand=True))
+                transpose = Image.ROTATE_270 if self.app_data['orientation'] == 'horizontal' else None
+                
+                # Hojas completas (imagen, número original del tile y sangrado) renderizadas
+                # en paralelo por el motor; se envían a la impresora en orden en este hilo
+                sheets = job.iter_sheets(pages_to_print, dpi, transpose)
+                for idx, (row, col, sheet) in enumerate(sheets):
                     current_page = idx + 1
                     
                     hdc = win32ui.CreateDC()
@@ -344,57 +357,8 @@ class PrintDialog:
                     hdc.StartDoc(f"Poster - Tile {current_page} de {total_to_print}")
                     hdc.StartPage()
                     
-                    # Calcular área
-                    page_left_mm = col * effective_w
-                    page_top_mm = row * effective_h
-                    
-                    crop_left_mm = max(0, page_left_mm - self.app_data['img_x'])
-                    crop_top_mm = max(0, page_top_mm - self.app_data['img_y'])
-                    crop_right_mm = min(self.app_data['img_width'], 
-                                       (page_left_mm + paper_w) - self.app_data['img_x'])
-                    crop_bottom_mm = min(self.app_data['img_height'], 
-                                        (page_top_mm + paper_h) - self.app_data['img_y'])
-                    
-                    # Convertir a pixels
-                    crop_left_px = int(crop_left_mm / scale_factor)
-                    crop_top_px = int(crop_top_mm / scale_factor)
-                    crop_right_px = int(crop_right_mm / scale_factor)
-                    crop_bottom_px = int(crop_bottom_mm / scale_factor)
-                    
-                    # Recortar
-                    cropped = img_to_print.crop((crop_left_px, crop_top_px, 
-                                                crop_right_px, crop_bottom_px))
-                    
-                    # Rotar si horizontal
-                    if self.app_data['orientation'] == 'horizontal':
-                        cropped = cropped.rotate(-90, expand=True, resample=Image.BICUBIC)
-                    
-                    # Ajustar calidad
-                    if self.quality.get() == "draft":
-                        # Reducir resolución para borrador
-                        w, h = cropped.size
-                        cropped = cropped.resize((w//2, h//2), Image.NEAREST)
-                    elif self.quality.get() == "high":
-                        # Mantener calidad alta (sin cambios)
-                        pass
-                    
-                    # Añadir número
-                    if self.app_data['show_page_numbers']:
-                        draw = ImageDraw.Draw(cropped)
-                        # Si es reimpresión, usar número original del tile
-                        if self.enable_reprint.get():
-                            page_num = self.app_data['pages_with_image'].index((row, col)) + 1
-                        else:
-                            page_num = current_page
-                        
-                        try:
-                            font = ImageFont.truetype("arial.ttf", 9)
-                        except Exception:
-                            font = ImageFont.load_default()
-                        draw.text((10, 10), str(page_num), fill='#4a4a4a', font=font)
-                    
                     # Imprimir
-                    dib = ImageWin.Dib(cropped)
+                    dib = ImageWin.Dib(sheet)
                     printer_w = hdc.GetDeviceCaps(8)
                     printer_h = hdc.GetDeviceCaps(10)
                     dib.draw(hdc.GetHandleOutput(), (0, 0, printer_w, printer_h))
@@ -407,92 +371,37 @@ class PrintDialog:
                 win32print.ClosePrinter(hprinter)
             
             self.dialog.destroy()
-            messagebox.showinfo("Éxito", f"Impresión completada\nTotal: {total_to_print} tiles")
+            messagebox.showinfo("Éxito", f"Impresión completada\nTotal: {total_to_print} tiles\n"
+                                        f"Resolución: {dpi} DPI (fuente: {job.effective_dpi:.0f} DPI)")
             
         except Exception as e:
             messagebox.showerror("Error", f"Error en impresión:\n{str(e)}")
     
+    def write_temp_pdf(self):
+        """Generar el PDF del póster (mismo motor que Exportar PDF) en un archivo temporal"""
+        temp_pdf = tempfile.NamedTemporaryFile(delete=False, suffix='.pdf')
+        temp_pdf_path = temp_pdf.name
+        temp_pdf.close()
+        
+        self.job.compression = self.base_compression.with_quality(self.quality.get())
+        self.job.write_pdf(temp_pdf_path)
+        
+        # Programar limpieza del PDF temporal al cerrar la app
+        atexit.register(lambda p=temp_pdf_path: os.unlink(p) if os.path.exists(p) else None)
+        return temp_pdf_path
+    
     def print_pdf_windows(self):
         """Generar PDF temporal y enviar a motor de Windows"""
         try:
-            from reportlab.pdfgen import canvas as pdf_canvas
-            from reportlab.lib.pagesizes import landscape
-            from reportlab.lib.units import mm
-            
-            # Crear PDF temporal
-            temp_pdf = tempfile.NamedTemporaryFile(delete=False, suffix='.pdf')
-            temp_pdf_path = temp_pdf.name
-            temp_pdf.close()
-            
-            paper_w = self.app_data['paper_w_mm']
-            paper_h = self.app_data['paper_h_mm']
-            
-            if self.app_data['orientation'] == 'horizontal':
-                page_size = landscape((paper_w * mm, paper_h * mm))
-            else:
-                page_size = (paper_w * mm, paper_h * mm)
-            
-            overlap = self.app_data['overlap_mm']
-            
-            img = self.app_data['original_image'].copy()
-            if self.app_data['rotation_angle'] != 0:
-                img = img.rotate(-self.app_data['rotation_angle'], expand=True, resample=Image.BICUBIC)
-            
-            actual_img_w_mm = self.app_data['img_width']
-            actual_img_h_mm = self.app_data['img_height']
-            
-            aspect_ratio = img.height / img.width
-            dpi = 300
-            target_width_px = int((actual_img_w_mm / 25.4) * dpi)
-            target_height_px = int(target_width_px * aspect_ratio)
-            
-            img = img.resize((target_width_px, target_height_px), Image.LANCZOS)
-            
-            temp_img_path = tempfile.NamedTemporaryFile(delete=False, suffix='.png')
-            img.save(temp_img_path.name)
-            temp_img_path.close()
-            
-            effective_w = paper_w - overlap
-            effective_h = paper_h - overlap
-            
-            pages_with_image = self.app_data['pages_with_image']
-            
-            c = pdf_canvas.Canvas(temp_pdf_path, pagesize=page_size)
-            
-            for page_idx, (row, col) in enumerate(pages_with_image):
-                page_num = page_idx + 1
-                page_left_mm = col * effective_w
-                page_top_mm = row * effective_h
-                
-                img_offset_x = self.app_data['img_x'] - page_left_mm
-                img_offset_y = self.app_data['img_y'] - page_top_mm
-                
-                c.drawImage(temp_img_path.name,
-                          img_offset_x * mm,
-                          page_size[1] - img_offset_y * mm - actual_img_h_mm * mm,
-                          width=actual_img_w_mm * mm,
-                          height=actual_img_h_mm * mm)
-                
-                if self.app_data['show_page_numbers']:
-                    c.setFillColorRGB(0.2, 0.2, 0.2)
-                    c.setFont("Helvetica-Bold", 12)
-                    c.drawString(10 * mm, page_size[1] - 10 * mm, str(page_num))
-                
-                c.showPage()
-            
-            c.save()
-            
-            # Limpiar temp image
-            os.unlink(temp_img_path.name)
-
-            # Programar limpieza del PDF temporal al cerrar la app
-            atexit.register(lambda p=temp_pdf_path: os.unlink(p) if os.path.exists(p) else None)
+            temp_pdf_path = self.write_temp_pdf()
 
             # Abrir PDF con diálogo de impresión de Windows
             os.startfile(temp_pdf_path, "print")
 
             self.dialog.destroy()
-            messagebox.showinfo("Éxito", f"PDF generado y enviado al sistema de impresión de Windows\n\n"
+            messagebox.showinfo("Éxito", f"PDF generado y enviado al sistema de impresión de Windows\n"
+                                        f"Resolución: {self.job.dpi} DPI (fuente: {self.job.effective_dpi:.0f} DPI)\n"
+                                        f"Compresión: {self.job.compression.describe()}\n\n"
                                         f"Nota: El archivo temporal se eliminará al cerrar la aplicación.")
 
         except ImportError:
@@ -503,79 +412,7 @@ class PrintDialog:
     def print_system_dialog(self):
         """Imprimir usando diálogo nativo de Windows (trabajo único)"""
         try:
-            from reportlab.pdfgen import canvas as pdf_canvas
-            from reportlab.lib.pagesizes import landscape
-            from reportlab.lib.units import mm
-            import win32api
-            
-            # Crear PDF temporal
-            temp_pdf = tempfile.NamedTemporaryFile(delete=False, suffix='.pdf')
-            temp_pdf_path = temp_pdf.name
-            temp_pdf.close()
-            
-            paper_w = self.app_data['paper_w_mm']
-            paper_h = self.app_data['paper_h_mm']
-            
-            if self.app_data['orientation'] == 'horizontal':
-                page_size = landscape((paper_w * mm, paper_h * mm))
-            else:
-                page_size = (paper_w * mm, paper_h * mm)
-            
-            overlap = self.app_data['overlap_mm']
-            
-            img = self.app_data['original_image'].copy()
-            if self.app_data['rotation_angle'] != 0:
-                img = img.rotate(-self.app_data['rotation_angle'], expand=True, resample=Image.BICUBIC)
-            
-            actual_img_w_mm = self.app_data['img_width']
-            actual_img_h_mm = self.app_data['img_height']
-            
-            aspect_ratio = img.height / img.width
-            dpi = 300
-            target_width_px = int((actual_img_w_mm / 25.4) * dpi)
-            target_height_px = int(target_width_px * aspect_ratio)
-            
-            img = img.resize((target_width_px, target_height_px), Image.LANCZOS)
-            
-            temp_img_path = tempfile.NamedTemporaryFile(delete=False, suffix='.png')
-            img.save(temp_img_path.name)
-            temp_img_path.close()
-            
-            effective_w = paper_w - overlap
-            effective_h = paper_h - overlap
-            
-            pages_with_image = self.app_data['pages_with_image']
-            
-            c = pdf_canvas.Canvas(temp_pdf_path, pagesize=page_size)
-            
-            for page_idx, (row, col) in enumerate(pages_with_image):
-                page_num = page_idx + 1
-                page_left_mm = col * effective_w
-                page_top_mm = row * effective_h
-                
-                img_offset_x = self.app_data['img_x'] - page_left_mm
-                img_offset_y = self.app_data['img_y'] - page_top_mm
-                
-                c.drawImage(temp_img_path.name,
-                          img_offset_x * mm,
-                          page_size[1] - img_offset_y * mm - actual_img_h_mm * mm,
-                          width=actual_img_w_mm * mm,
-                          height=actual_img_h_mm * mm)
-                
-                if self.app_data['show_page_numbers']:
-                    c.setFillColorRGB(0.2, 0.2, 0.2)
-                    c.setFont("Helvetica-Bold", 12)
-                    c.drawString(10 * mm, page_size[1] - 10 * mm, str(page_num))
-                
-                c.showPage()
-            
-            c.save()
-            
-            # Limpiar temp image
-            os.unlink(temp_img_path.name)
-
-            # Programar limpieza del PDF temporal al cerrar la app
-            atexit.register(lambda p=temp_pdf_path: os.unlink(p) if os.path.exists(p) else None)
+            temp_pdf_path = self.write_temp_pdf()
 
             # Usar ShellExecute con verbo "printto" para imprimir directamente
             win32api.ShellExecute(
@@ -588,7 +425,8 @@ class PrintDialog:
             )
             
             self.dialog.destroy()
-            messagebox.showinfo("Éxito", f"Documento enviado al diálogo del sistema\n\n"
+            messagebox.showinfo("Éxito", f"Documento enviado al diálogo del sistema\n"
+                                        f"Resolución: {self.job.dpi} DPI (fuente: {self.job.effective_dpi:.0f} DPI)\n\n"
                                         f"Se abrirá la ventana de impresión de Windows.")
             
         except ImportError:
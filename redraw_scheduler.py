@@ -0,0 +1,61 @@
+import time
+
+
+class RedrawScheduler:
+    """
+    Planificador central de redibujo.
+    Los handlers solo invalidan; un único render agendado con after/after_idle
+    se ejecuta como máximo una vez por frame (límite configurable de fps).
+    """
+
+    def __init__(self, widget, render, max_fps=60):
+        self.widget = widget
+        self.render = render
+        self.max_fps = max_fps
+
+        self._job = None
+        self._last_render = 0.0
+        self.stats = {'requests': 0, 'renders': 0, 'coalesced': 0}
+
+    @property
+    def frame_interval(self):
+        """Tiempo mínimo entre renders (segundos)"""
+        return 1.0 / self.max_fps if self.max_fps else 0.0
+
+    @property
+    def pending(self):
+        return self._job is not None
+
+    def invalidate(self):
+        """Marcar la vista como sucia; los pedidos dentro del mismo frame se agrupan"""
+        self.stats['requests'] += 1
+        if self._job is not None:
+            self.stats['coalesced'] += 1
+            return
+
+        wait = self._last_render + self.frame_interval - time.perf_counter()
+        if wait <= 0:
+            self._job = self.widget.after_idle(self._run)
+        else:
+            self._job = self.widget.after(max(1, int(wait * 1000)), self._run)
+
+    def flush(self):
+        """Renderizar ya si hay un redibujo pendiente"""
+        if self._job is not None:
+            self.widget.after_cancel(self._job)
+            self._run()
+
+    def cancel(self):
+        if self._job is not None:
+            self.widget.after_cancel(self._job)
+            self._job = None
+
+    def reset_stats(self):
+        for key in self.stats:
+            self.stats[key] = 0
+
+    def _run(self):
+        self._job = None
+        self._last_render = time.perf_counter()
+        self.stats['renders'] += 1
+        self.render()
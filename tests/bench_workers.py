@@ -0,0 +1,88 @@
+"""
+Benchmark de la exportación en paralelo: exporta el mismo trabajo con distinta
+cantidad de hilos (PosterJob.workers) y muestra tiempos y páginas por segundo.
+
+    python tests/bench_workers.py [imagen] [--workers 1,2,4] [--repeat 3]
+
+Sin imagen se genera una fuente sintética (TIFF RGB sin comprimir, backend mmap).
+El PDF debe salir idéntico con cualquier cantidad de hilos: se compara su hash.
+"""
+import argparse
+import hashlib
+import os
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from PIL import Image
+from geometry import TileLayout
+from image_loader import SourceImage
+from pdf_images import PdfCompression
+from poster_engine import PosterJob
+
+# Mismo póster que el test de memoria: 1 m de ancho en A4 apaisado (16 hojas)
+SOURCE_SIZE = (6000, 4500)
+POSTER_WIDTH_MM = 1000
+
+
+def synthetic_source(directory):
+    path = os.path.join(directory, "source.tif")
+    small = Image.radial_gradient('L').resize((400, 300)).convert('RGB')
+    small.resize(SOURCE_SIZE, Image.BICUBIC).save(path)
+    return path
+
+
+def make_job(source, workers, angle, dpi):
+    width, height = source.size
+    img_rect = (0, 0, POSTER_WIDTH_MM, POSTER_WIDTH_MM * height / width)
+    layout = TileLayout(297, 210, 10, img_rect)
+    return PosterJob(source, angle, img_rect, layout, dpi,
+                     compression=PdfCompression('jpeg'), workers=workers)
+
+
+def export_time(job, filename, repeat):
+    """Mejor tiempo de repeat exportaciones y hash del PDF"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        job.write_pdf(filename)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    with open(filename, 'rb') as f:
+        return best, hashlib.sha1(f.read()).hexdigest()[:12]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('image', nargs='?', help="imagen fuente (por defecto una sintética)")
+    parser.add_argument('--workers', default='1,2,4', help="cantidades de hilos separadas por coma")
+    parser.add_argument('--repeat', type=int, default=3, help="exportaciones por cantidad (se toma la mejor)")
+    parser.add_argument('--angle', type=float, default=30, help="rotación en grados")
+    parser.add_argument('--dpi', type=int, default=200)
+    args = parser.parse_args()
+
+    # PDF reproducible (sin fecha ni ID aleatorio) para comparar hashes
+    from reportlab import rl_config
+    rl_config.invariant = 1
+
+    with tempfile.TemporaryDirectory() as directory:
+        source = SourceImage(args.image or synthetic_source(directory))
+        source.raster()
+        print(f"Fuente {source.size[0]}x{source.size[1]} px, {os.cpu_count()} núcleos, "
+              f"{args.angle:g}°, {args.dpi} DPI")
+
+        baseline = None
+        for workers in (int(w) for w in args.workers.split(',')):
+            job = make_job(source, workers, args.angle, args.dpi)
+            elapsed, digest = export_time(job, os.path.join(directory, f"w{workers}.pdf"), args.repeat)
+            baseline = baseline or elapsed
+            print(f"workers={workers}: {elapsed:.2f} s, {len(job.pages) / elapsed:.1f} pág/s, "
+                  f"x{baseline / elapsed:.2f}, pdf {digest}")
+        source.close()
+
+
+if __name__ == '__main__':
+    main()
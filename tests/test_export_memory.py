@@ -0,0 +1,100 @@
+"""
+Regresión de memoria de la exportación: el motor (PosterJob) renderiza cada hoja
+leyendo solo su región de la fuente, así que el pico no debe escalar con la imagen.
+"""
+import os
+import subprocess
+import sys
+import textwrap
+import tracemalloc
+
+import pytest
+from PIL import Image, ImageFile
+
+from geometry import TileLayout
+from image_loader import SourceImage
+from poster_engine import PosterJob
+
+pytest.importorskip("reportlab")
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(TESTS_DIR)
+
+# Fuente sintética: TIFF RGB sin comprimir (backend mmap de TiledRaster)
+SOURCE_SIZE = (6000, 4500)
+SOURCE_BYTES = SOURCE_SIZE[0] * SOURCE_SIZE[1] * 3
+
+# Múltiplo máximo del tamaño de la fuente permitido como pico durante la exportación
+MAX_PEAK_RATIO = 0.5
+
+# Póster de 1 m de ancho en A4 apaisado a 150 DPI (16 hojas)
+POSTER_WIDTH_MM = 1000
+DPI = 150
+
+
+@pytest.fixture(scope="module")
+def source_path(tmp_path_factory):
+    path = tmp_path_factory.mktemp("export_memory") / "source.tif"
+    small = Image.radial_gradient('L').resize((400, 300)).convert('RGB')
+    small.resize(SOURCE_SIZE, Image.BICUBIC).save(path)
+    return str(path)
+
+
+def make_job(path, angle=0):
+    source = SourceImage(path)
+    width, height = source.size
+    img_rect = (0, 0, POSTER_WIDTH_MM, POSTER_WIDTH_MM * height / width)
+    layout = TileLayout(297, 210, 10, img_rect)
+    return PosterJob(source, angle, img_rect, layout, DPI, workers=1)
+
+
+@pytest.mark.parametrize("angle", [0, 90, 30])
+def test_export_peak_tracemalloc(source_path, tmp_path, monkeypatch, angle):
+    job = make_job(source_path, angle)
+    assert job.source.raster().backend == 'mmap'
+
+    # Las regiones salen del mapeo (frombytes): decodificar el archivo es leerlo entero
+    full_decodes = []
+    original_load = ImageFile.ImageFile.load
+
+    def tracking_load(image):
+        full_decodes.append(image.size)
+        return original_load(image)
+
+    monkeypatch.setattr(ImageFile.ImageFile, 'load', tracking_load)
+
+    tracemalloc.start()
+    try:
+        pages = job.write_pdf(str(tmp_path / "poster.pdf"))
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    assert pages == len(job.pages) > 1
+    assert SOURCE_SIZE not in full_decodes
+    assert peak < MAX_PEAK_RATIO * SOURCE_BYTES, f"pico {peak / 1e6:.1f} MB"
+
+
+@pytest.mark.skipif(sys.platform == 'win32', reason="resource no existe en Windows")
+def test_export_peak_rss(source_path, tmp_path):
+    # tracemalloc no ve los buffers de Pillow: el RSS se mide en un proceso aparte.
+    # Calentamiento sin pasar por write_pdf: carga reportlab y mapea la fuente
+    script = textwrap.dedent(f"""
+        import resource, sys
+        sys.path[:0] = {[ROOT_DIR, TESTS_DIR]!r}
+        from test_export_memory import make_job
+        job = make_job({source_path!r})
+        from reportlab.pdfgen import canvas
+        canvas.Canvas({str(tmp_path / "warmup.pdf")!r}).save()
+        job.encode_pdf_piece(*job.pages[0])
+        before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        job.write_pdf({str(tmp_path / "poster.pdf")!r})
+        after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        print(after - before)
+    """)
+    out = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True)
+    growth = int(out.stdout.split()[-1])
+    # ru_maxrss: KB en Linux, bytes en macOS
+    if sys.platform != 'darwin':
+        growth *= 1024
+    assert growth < MAX_PEAK_RATIO * SOURCE_BYTES, f"crecimiento de RSS {growth / 1e6:.1f} MB"
@@ -0,0 +1,102 @@
+"""
+Streams de imagen del PDF: lo que se embebe decodifica al tamaño declarado, y si
+ReportLab no expone los internos que usa draw_encoded_image se cae a drawImage.
+"""
+import io
+import re
+import zlib
+
+import pytest
+from PIL import Image, ImageChops
+
+import pdf_images
+from pdf_images import EncodedImage, draw_encoded_image, supports_encoded_streams
+
+canvas = pytest.importorskip("reportlab.pdfgen.canvas")
+
+IMAGE_OBJECT = re.compile(rb'<<([^<>]*?/Subtype /Image[^<>]*?)>>\s*stream\r?\n', re.S)
+
+
+def sample_image():
+    return Image.radial_gradient('L').resize((321, 123)).convert('RGB')
+
+
+def write_pdf(path, encoded):
+    pdf = canvas.Canvas(str(path))
+    draw_encoded_image(pdf, encoded, 10, 10, encoded.width, encoded.height)
+    pdf.showPage()
+    pdf.save()
+    return path.read_bytes()
+
+
+def image_objects(data):
+    objects = []
+    for match in IMAGE_OBJECT.finditer(data):
+        header = match.group(1)
+        length = int(re.search(rb'/Length (\d+)', header).group(1))
+        stream = data[match.end():match.end() + length]
+        width = int(re.search(rb'/Width (\d+)', header).group(1))
+        height = int(re.search(rb'/Height (\d+)', header).group(1))
+        filters = re.findall(rb'/(\w+Decode)', header)
+        objects.append(((width, height), [f.decode() for f in filters], stream))
+    return objects
+
+
+def test_reportlab_exposes_internals(tmp_path):
+    assert supports_encoded_streams(canvas.Canvas(str(tmp_path / "probe.pdf")))
+
+
+def test_flate_stream_round_trip(tmp_path):
+    image = sample_image()
+    [(size, filters, stream)] = image_objects(write_pdf(tmp_path / "flate.pdf", EncodedImage.encode(image, 'flate')))
+
+    assert size == image.size
+    assert filters == ['FlateDecode']
+    decoded = Image.frombytes('RGB', size, zlib.decompress(stream))
+    assert ImageChops.difference(decoded, image).getbbox() is None
+
+
+def test_jpeg_stream_round_trip(tmp_path):
+    image = sample_image()
+    [(size, filters, stream)] = image_objects(write_pdf(tmp_path / "jpeg.pdf", EncodedImage.encode(image, 'jpeg')))
+
+    assert size == image.size
+    assert filters == ['DCTDecode']
+    assert Image.open(io.BytesIO(stream)).size == image.size
+
+
+@pytest.mark.parametrize("encoding, expected_filter", [('flate', 'FlateDecode'), ('jpeg', 'DCTDecode')])
+def test_fallback_without_internals(tmp_path, monkeypatch, encoding, expected_filter):
+    # Simula una versión de ReportLab que renombró los internos del canvas
+    monkeypatch.setattr(pdf_images, 'CANVAS_INTERNALS', pdf_images.CANVAS_INTERNALS + ('_renamed',))
+    assert not supports_encoded_streams(canvas.Canvas(str(tmp_path / "probe.pdf")))
+
+    image = sample_image()
+    [(size, filters, _)] = image_objects(write_pdf(tmp_path / "fallback.pdf", EncodedImage.encode(image, encoding)))
+
+    assert size == image.size
+    assert filters[-1] == expected_filter
+
+
+def test_write_pdf_probes_internals_once(tmp_path, monkeypatch):
+    import poster_engine
+    from geometry import TileLayout
+    from image_loader import SourceImage
+
+    probes = []
+
+    def counting_probe(pdf):
+        probes.append(pdf)
+        return supports_encoded_streams(pdf)
+
+    monkeypatch.setattr(poster_engine, 'supports_encoded_streams', counting_probe)
+    monkeypatch.setattr(pdf_images, 'supports_encoded_streams', counting_probe)
+
+    path = str(tmp_path / "source.png")
+    sample_image().save(path)
+    img_rect = (0, 0, 600, 600 * 123 / 321)
+    job = poster_engine.PosterJob(SourceImage(path), 0, img_rect, TileLayout(297, 210, 10, img_rect), 30)
+    pages = job.write_pdf(str(tmp_path / "poster.pdf"))
+
+    assert pages > 1
+    assert len(probes) == 1
@@ -0,0 +1,49 @@
+"""
+Caché en disco de la vista previa: reabrir un archivo ya visto debe dar la misma
+pirámide (mismos niveles y tamaños) que la carga fresca.
+"""
+import pytest
+from PIL import Image, ImageChops
+
+from disk_cache import DiskCache
+from image_loader import ImageLoadTask, SourceImage
+
+
+class FakeWidget:
+    """Sustituto de un widget Tk: los eventos se leen a mano de la cola de la tarea"""
+
+    def after(self, ms, callback):
+        return None
+
+
+def run_load(path, disk_cache):
+    """Ejecutar la carga en su hilo y devolver (pirámide de 'ready', from_cache)"""
+    task = ImageLoadTask(FakeWidget(), path, lambda *args: None, disk_cache=disk_cache)
+    task._thread.join()
+    stages = {}
+    while not task._events.empty():
+        stage, payload, _ = task._events.get_nowait()
+        stages[stage] = payload
+    assert 'error' not in stages, stages.get('error')
+    return stages['ready'], task.from_cache
+
+
+@pytest.mark.parametrize("size, fmt", [
+    ((3000, 2000), 'PNG'),    # sin draft, lado mayor entre 1x y 2x PREVIEW_MAX_SIDE
+    ((6000, 4000), 'TIFF'),   # sin comprimir: vista previa por bandas mapeadas
+    ((6000, 4000), 'JPEG'),   # draft DCT
+])
+def test_cache_hit_matches_fresh_load(tmp_path, size, fmt):
+    path = str(tmp_path / f"source.{fmt.lower()}")
+    Image.radial_gradient('L').resize(size).convert('RGB').save(path, fmt)
+    cache = DiskCache(str(tmp_path / "cache"))
+
+    fresh, from_cache = run_load(path, cache)
+    assert not from_cache
+    assert max(fresh.levels[0].size) >= SourceImage.PREVIEW_MAX_SIDE
+
+    cached, from_cache = run_load(path, cache)
+    assert from_cache
+    assert [level.size for level in cached.levels] == [level.size for level in fresh.levels]
+    for fresh_level, cached_level in zip(fresh.levels, cached.levels):
+        assert ImageChops.difference(fresh_level, cached_level).getbbox() is None
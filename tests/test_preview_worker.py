@@ -0,0 +1,48 @@
+"""
+PreviewWorker: un render que falla se informa por on_error (en el hilo del polling)
+y el worker sigue atendiendo pedidos.
+"""
+import time
+
+from preview_worker import PreviewWorker
+
+
+class FakeWidget:
+    """Sustituto de un widget Tk: los after se ejecutan a mano con run_pending"""
+
+    def __init__(self):
+        self.jobs = []
+
+    def after(self, ms, callback):
+        self.jobs.append(callback)
+        return len(self.jobs)
+
+    def run_pending(self):
+        while self.jobs:
+            self.jobs.pop(0)()
+
+
+def submit_and_wait(worker, widget, key, fn):
+    """Pedir fn y, cuando el worker terminó de publicarlo, correr el polling de Tk"""
+    worker.submit(key, fn)
+    for _ in range(500):
+        with worker._cond:
+            if not worker._busy and worker._pending is None:
+                break
+        time.sleep(0.01)
+    widget.run_pending()
+
+
+def test_failed_render_reports_error_and_worker_recovers():
+    widget = FakeWidget()
+    results, errors = [], []
+    worker = PreviewWorker(widget, lambda key, result: results.append((key, result)),
+                           on_error=lambda key, error: errors.append((key, type(error))))
+
+    submit_and_wait(worker, widget, 'roto', lambda: 1 / 0)
+    assert errors == [('roto', ZeroDivisionError)]
+    assert results == []
+
+    submit_and_wait(worker, widget, 'bien', lambda: 42)
+    assert results == [('bien', 42)]
+    assert worker.stats['failed'] == 1 and worker.stats['completed'] == 1
@@ -0,0 +1,26 @@
+"""
+Ciclo de vida de SourceImage: cerrar libera el mapeo de la fuente (en Windows lo
+deja bloqueado) y la imagen se puede volver a leer si hace falta.
+"""
+from PIL import Image, ImageChops
+
+from image_loader import SourceImage
+
+
+def test_close_releases_mapping(tmp_path):
+    path = str(tmp_path / "source.tif")
+    image = Image.radial_gradient('L').resize((640, 480)).convert('RGB')
+    image.save(path, 'TIFF')
+
+    source = SourceImage(path)
+    box = (100, 50, 300, 250)
+    before = source.read_region(box)
+    raster = source.raster()
+    assert raster.backend == 'mmap' and raster._buffer is not None
+
+    source.close()
+    assert raster._buffer is None and raster._file is None
+    source.close()
+
+    assert ImageChops.difference(source.read_region(box), before).getbbox() is None
+    source.close()
@@ -0,0 +1,142 @@
+import math
+from PIL import Image
+from geometry import rotated_size, rotation_matrix
+
+
+class TileRenderer:
+    """
+    Renderizado por hoja directo desde la fuente, sin imagen intermedia del póster.
+    Para cada área del póster (mm) se calcula la región de la fuente que cae en ella,
+    se lee solo esa región (SourceImage.read_region) y se lleva a la grilla de salida
+    con una única transformación afín (escala + rotación + traslación).
+    Memoria y CPU escalan con las hojas impresas, no con el tamaño total de la imagen.
+    """
+
+    # Margen (px fuente) alrededor de la región leída para el soporte del filtro
+    FILTER_PADDING = 3
+
+    def __init__(self, source, angle, img_rect, resample=Image.BICUBIC):
+        """
+        source: SourceImage. angle: rotación en grados (misma convención que la UI).
+        img_rect: (x, y, ancho, alto) en mm de la imagen rotada en el póster.
+        """
+        self.source = source
+        self.angle = angle
+        self.img_rect = img_rect
+        self.resample = resample
+
+        src_w, src_h = source.size
+        self.rotated_size = rotated_size(src_w, src_h, angle)
+        self.matrix = rotation_matrix(src_w, src_h, angle)
+
+    def piece_rect(self, area):
+        """Intersección (left, top, right, bottom) mm entre area y la imagen, o None"""
+        img_x, img_y, img_w, img_h = self.img_rect
+        left = max(area[0], img_x)
+        top = max(area[1], img_y)
+        right = min(area[2], img_x + img_w)
+        bottom = min(area[3], img_y + img_h)
+        if right <= left or bottom <= top:
+            return None
+        return left, top, right, bottom
+
+    def piece_affine(self, rect, out_w, out_h):
+        """
+        Matriz (a, b, c, d, e, f): pixel de la pieza de out_w x out_h que cubre rect (mm)
+        -> pixel de la fuente sin rotar. Compone escala mm->px rotado con la rotación.
+        """
+        img_x, img_y, img_w, img_h = self.img_rect
+        rot_w, rot_h = self.rotated_size
+
+        # Pieza -> imagen rotada (px)
+        kx = rot_w / img_w
+        ky = rot_h / img_h
+        sx = (rect[2] - rect[0]) * kx / out_w
+        sy = (rect[3] - rect[1]) * ky / out_h
+        ox = (rect[0] - img_x) * kx
+        oy = (rect[1] - img_y) * ky
+
+        # Imagen rotada -> fuente
+        a, b, c, d, e, f = self.matrix
+        return (a * sx, b * sy, a * ox + b * oy + c,
+                d * sx, e * sy, d * ox + e * oy + f)
+
+    def render(self, area, dpi):
+        """
+        Pieza de la imagen que cae en area (left, top, right, bottom) mm, a dpi.
+        Devuelve (Image, rect_mm) con rect_mm el rectángulo que ocupa la pieza, o None.
+        """
+        rect = self.piece_rect(area)
+        if rect is None:
+            return None
+
+        out_w = max(1, round((rect[2] - rect[0]) / 25.4 * dpi))
+        out_h = max(1, round((rect[3] - rect[1]) / 25.4 * dpi))
+        return self.render_rect(rect, out_w, out_h), rect
+
+    def render_rect(self, rect, out_w, out_h):
+        """Re-muestrear rect (mm, dentro de la imagen) a una pieza de out_w x out_h px"""
+        a, b, c, d, e, f = self.piece_affine(rect, out_w, out_h)
+
+        # Caja de la fuente que alimenta la pieza (esquinas transformadas + soporte del filtro)
+        xs = [c, a * out_w + c, b * out_h + c, a * out_w + b * out_h + c]
+        ys = [f, d * out_w + f, e * out_h + f, d * out_w + e * out_h + f]
+        # Px fuente por px de salida (la rotación no cambia el área)
+        ratio = math.sqrt(abs(a * e - b * d))
+        pad = self.FILTER_PADDING * max(1.0, ratio)
+        box = (math.floor(min(xs) - pad), math.floor(min(ys) - pad),
+               math.ceil(max(xs) + pad), math.ceil(max(ys) + pad))
+
+        region = self.source.read_region(box)
+        if region is None:
+            # La pieza solo cubre esquinas vacías de la imagen rotada
+            return Image.new(self.source_mode(), (out_w, out_h))
+
+        # Coordenadas relativas a la región leída
+        x0 = max(0, box[0])
+        y0 = max(0, box[1])
+        c -= x0
+        f -= y0
+
+        if (b == 0 and d == 0) or (a == 0 and e == 0):
+            return self._render_quarter_turn(region, (a, b, c, d, e, f), out_w, out_h)
+
+        if ratio > 1:
+            # Reducir primero con antialias para que la afín trabaje cerca de 1:1
+            small_w = max(1, math.ceil(region.width / ratio))
+            small_h = max(1, math.ceil(region.height / ratio))
+            fx = region.width / small_w
+            fy = region.height / small_h
+            region = region.resize((small_w, small_h), Image.LANCZOS)
+            a, b, c = a / fx, b / fx, c / fx
+            d, e, f = d / fy, e / fy, f / fy
+
+        return region.transform((out_w, out_h), Image.AFFINE, (a, b, c, d, e, f),
+                                resample=self.resample)
+
+    def _render_quarter_turn(self, region, affine, out_w, out_h):
+        """
+        Rotaciones múltiplo de 90°: la rotación se pliega en las coordenadas del recorte.
+        Un solo resize LANCZOS (con box) en la orientación de la fuente y luego un
+        transpose exacto, sin interpolar la rotación.
+        """
+        a, b, c, d, e, f = affine
+        if b == 0 and d == 0:
+            # 0° / 180°: los ejes de la pieza siguen a los de la fuente
+            size = (out_w, out_h)
+            x_end, y_end = c + a * out_w, f + e * out_h
+            transpose = None if a > 0 else Image.ROTATE_180
+        else:
+            # 90° / 270°: el eje x de la pieza recorre el eje y de la fuente
+            size = (out_h, out_w)
+            x_end, y_end = c + b * out_h, f + d * out_w
+            transpose = Image.ROTATE_270 if b > 0 else Image.ROTATE_90
+
+        box = (max(0.0, min(c, x_end)), max(0.0, min(f, y_end)),
+               min(region.width, max(c, x_end)), min(region.height, max(f, y_end)))
+        piece = region.resize(size, Image.LANCZOS, box=box)
+        return piece if transpose is None else piece.transpose(transpose)
+
+    def source_mode(self):
+        return self.source.raster().mode
+
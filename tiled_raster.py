@@ -0,0 +1,207 @@
+import mmap
+import os
+import tempfile
+import threading
+from PIL import Image
+
+
+# Bytes por pixel de los rawmodes que se pueden leer directo del archivo
+RAW_BYTES_PER_PIXEL = {
+    'L': 1, 'RGB': 3, 'BGR': 3, 'RGBA': 4, 'RGBX': 4, 'BGRA': 4, 'BGRX': 4, 'CMYK': 4,
+}
+
+
+class RawBlock:
+    """Bloque de pixels sin comprimir (strip o tile) dentro de un buffer mapeado"""
+
+    def __init__(self, extents, offset, rawmode, stride=0, orientation=1):
+        self.extents = extents
+        self.offset = offset
+        self.rawmode = rawmode
+        self.bpp = RAW_BYTES_PER_PIXEL[rawmode]
+        self.stride = stride or (extents[2] - extents[0]) * self.bpp
+        self.orientation = orientation
+
+    def read(self, buf, mode, box):
+        """
+        Pixels de box (coords de imagen, dentro del bloque) como Image de modo mode.
+        El decodificador raw lee las filas directo del buffer mapeado (con el stride del
+        bloque), sin copiar antes la región a un bytes intermedio.
+        """
+        bx0, by0, bx1, by1 = self.extents
+        x0, y0, x1, y1 = box
+        width = x1 - x0
+        height = y1 - y0
+        # Primera fila en memoria: la de arriba, o la de abajo si el bloque está invertido
+        row = y0 - by0 if self.orientation == 1 else by1 - y1
+        first = self.offset + row * self.stride + (x0 - bx0) * self.bpp
+        last = first + (height - 1) * self.stride + width * self.bpp
+
+        with memoryview(buf) as view:
+            with view[first:last] as rows:
+                return Image.frombytes(mode, (width, height), rows, 'raw',
+                                       self.rawmode, self.stride, self.orientation)
+
+
+class TiledRaster:
+    """
+    Acceso por regiones a la imagen fuente sin tenerla completa en memoria.
+    - Formatos sin comprimir (TIFF raw por strips o tiles, BMP, PPM): se mapea el
+      archivo fuente con mmap y cada región lee solo los bytes de sus filas.
+    - Resto (JPEG, PNG, TIFF comprimido): se decodifica una vez y se vuelca por bandas a
+      un buffer raw en disco (caché persistente si se pasa disk_cache), que luego se mapea.
+    read_region devuelve solo la región pedida: la memoria por pedido es la de una hoja.
+    """
+
+    # Filas por banda al volcar a disco (acota la copia extra durante el volcado)
+    SPILL_BAND_ROWS = 256
+
+    def __init__(self, path, disk_cache=None):
+        self.path = path
+        self.disk_cache = disk_cache
+        with Image.open(path) as img:
+            self.size = img.size
+            self.source_mode = img.mode
+            tiles = list(img.tile)
+
+        self.mode = self.source_mode if self.source_mode in ('RGB', 'RGBA') else 'RGB'
+        self.blocks = self._raw_blocks(tiles)
+        self.backend = 'mmap' if self.blocks is not None else 'spill'
+
+        self._buffer = None
+        self._file = None
+        self._lock = threading.Lock()
+
+    @property
+    def width(self):
+        return self.size[0]
+
+    @property
+    def height(self):
+        return self.size[1]
+
+    def _raw_blocks(self, tiles):
+        """Bloques raw que cubren la imagen sin huecos, o None si hay que decodificar"""
+        if not tiles:
+            return None
+        blocks = []
+        area = 0
+        for tile in tiles:
+            codec, extents, offset, args = tile[:4]
+            if codec != 'raw':
+                return None
+            if isinstance(args, str):
+                args = (args, 0, 1)
+            rawmode, stride, orientation = (tuple(args) + (0, 1))[:3]
+            if rawmode not in RAW_BYTES_PER_PIXEL or orientation not in (1, -1):
+                return None
+            blocks.append(RawBlock(tuple(extents), offset, rawmode, stride, orientation))
+            area += (extents[2] - extents[0]) * (extents[3] - extents[1])
+
+        # Planos separados (PlanarConfiguration 2) repiten área: no se leen directo
+        if area != self.size[0] * self.size[1]:
+            return None
+        return blocks
+
+    def _map(self, path):
+        self._file = open(path, 'rb')
+        self._buffer = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def _ensure_mapped(self):
+        with self._lock:
+            if self._buffer is not None:
+                return
+            if self.backend == 'mmap':
+                self._map(self.path)
+            else:
+                self._spill()
+
+    def _spill(self):
+        """Volcar la imagen decodificada a un buffer raw (RGB/RGBA) y mapearlo"""
+        stride = self.width * len(self.mode)
+        self.blocks = [RawBlock((0, 0) + self.size, 0, self.mode, stride)]
+
+        key = None
+        if self.disk_cache is not None:
+            entry = self.disk_cache.lookup(self.path)
+            if entry is not None and entry[1].get('size') == list(self.size):
+                self._map(self.disk_cache.data_path(entry[0]))
+                return
+            try:
+                os.makedirs(self.disk_cache.directory, exist_ok=True)
+                key = self.disk_cache.make_key(self.path)
+                out = open(self.disk_cache.data_path(key) + '.tmp', 'w+b')
+            except OSError as e:
+                print(f"No se pudo usar la caché de rasters: {e}")
+                key = None
+        if key is None:
+            out = tempfile.TemporaryFile()
+
+        image = Image.open(self.path)
+        image.load()
+        if image.mode != self.mode:
+            image = image.convert(self.mode)
+
+        with out:
+            for top in range(0, self.height, self.SPILL_BAND_ROWS):
+                bottom = min(self.height, top + self.SPILL_BAND_ROWS)
+                out.write(image.crop((0, top, self.width, bottom)).tobytes())
+            out.flush()
+
+            if key is None:
+                # Archivo temporal anónimo: se mapea antes de cerrarlo
+                self._buffer = mmap.mmap(out.fileno(), 0, access=mmap.ACCESS_READ)
+                return
+
+        data_path = self.disk_cache.data_path(key)
+        os.replace(data_path + '.tmp', data_path)
+        self.disk_cache.commit(key, {'size': list(self.size), 'mode': self.mode})
+        self._map(data_path)
+
+    def prepare(self):
+        """Dejar listo el acceso por regiones (mapear la fuente o volcarla a disco)"""
+        self._ensure_mapped()
+
+    def read_region(self, box):
+        """
+        Región (left, top, right, bottom) en px de la fuente, recortada a la imagen.
+        Devuelve una Image RGB/RGBA del tamaño de la región (None si queda vacía).
+        """
+        left = max(0, int(box[0]))
+        top = max(0, int(box[1]))
+        right = min(self.width, int(box[2]))
+        bottom = min(self.height, int(box[3]))
+        if right <= left or bottom <= top:
+            return None
+
+        self._ensure_mapped()
+        mode = self.source_mode if self.backend == 'mmap' else self.mode
+
+        if len(self.blocks) == 1:
+            region = self.blocks[0].read(self._buffer, mode, (left, top, right, bottom))
+        else:
+            region = Image.new(mode, (right - left, bottom - top))
+            for block in self.blocks:
+                bx0, by0, bx1, by1 = block.extents
+                x0, y0 = max(left, bx0), max(top, by0)
+                x1, y1 = min(right, bx1), min(bottom, by1)
+                if x1 > x0 and y1 > y0:
+                    region.paste(block.read(self._buffer, mode, (x0, y0, x1, y1)), (x0 - left, y0 - top))
+
+        if region.mode != self.mode:
+            region = region.convert(self.mode)
+        return region
+
+    def close(self):
+        """Liberar el mapeo y el archivo; un read_region posterior vuelve a mapear"""
+        with self._lock:
+            if self._buffer is not None:
+                try:
+                    self._buffer.close()
+                except BufferError:
+                    # Un hilo todavía lee una región: el mapeo se libera al soltarla
+                    pass
+                self._buffer = None
+            if self._file is not None:
+                self._file.close()
+                self._file = None
@@ -0,0 +1,241 @@
+import math
+import time
+
+
+class WorkspaceScene:
+    """
+    Escena retenida del canvas de vista previa.
+    Los items (tiles, números, imagen, selección) se crean una sola vez y luego
+    solo se actualizan con coords/itemconfig cuando cambia su estado.
+    """
+
+    TILE_STYLE = {'outline': '#ccc', 'width': 1, 'fill': ''}
+    TILE_HIGHLIGHT_STYLE = {'outline': '#0066cc', 'width': 2, 'fill': '#e6f2ff'}
+    HANDLE_SIZE = 10
+
+    def __init__(self, canvas, font_manager):
+        self.canvas = canvas
+        self.font_manager = font_manager
+
+        self.tiles = {}          # (row, col) -> id del rectángulo
+        self.page_texts = {}     # (row, col) -> id del número de página
+        self.highlighted = {}    # (row, col) -> número de página mostrado
+        self.grid_key = None
+        self.scroll_region = None
+
+        self.image_item = None
+        self.image_photo = None
+        self.image_pos = None
+
+        self.selection_rect = None
+        self.handles = {}        # corner -> id del handle
+        self.selection_coords = None
+
+        # Métricas para comparar latencia de arrastre
+        self.stats = {'frames': 0, 'tk_calls': 0, 'last_tk_calls': 0,
+                      'last_ms': 0.0, 'avg_ms': 0.0}
+        self._frame_calls = 0
+
+    def _tile_px(self, row, col, geometry):
+        paper_w, paper_h, overlap, scale = geometry
+        effective_w = paper_w - overlap
+        effective_h = paper_h - overlap
+        return (int(col * effective_w * scale), int(row * effective_h * scale),
+                int((col * effective_w + paper_w) * scale), int((row * effective_h + paper_h) * scale))
+
+    def _restack(self):
+        """Orden de apilado: tiles < números < imagen < selección"""
+        self.canvas.tag_lower('page_num')
+        self.canvas.tag_lower('tile')
+        self._frame_calls += 2
+
+    def visible_region(self, margin=0):
+        """Región visible del canvas (coords de canvas, px) ampliada con un margen"""
+        x0 = self.canvas.canvasx(0)
+        y0 = self.canvas.canvasy(0)
+        return (x0 - margin, y0 - margin,
+                x0 + self.canvas.winfo_width() + margin, y0 + self.canvas.winfo_height() + margin)
+
+    @staticmethod
+    def visible_tiles(region, paper_w, paper_h, overlap, scale, rows, cols):
+        """Rangos (filas, columnas) de tiles que intersectan la región visible"""
+        effective_w = paper_w - overlap
+        effective_h = paper_h - overlap
+        x0, y0, x1, y1 = (v / scale for v in region)
+        col_range = range(max(0, math.floor((x0 - paper_w) / effective_w) + 1),
+                          min(cols, math.floor(x1 / effective_w) + 1))
+        row_range = range(max(0, math.floor((y0 - paper_h) / effective_h) + 1),
+                          min(rows, math.floor(y1 / effective_h) + 1))
+        return row_range, col_range
+
+    def sync_grid(self, row_range, col_range, paper_w, paper_h, overlap, scale):
+        """
+        Mantener solo los tiles visibles: crear los recién expuestos, borrar los que
+        salieron de vista y reubicar todos solo si cambió papel, solapado o zoom.
+        """
+        geometry = (paper_w, paper_h, overlap, scale)
+        key = (row_range, col_range) + geometry
+        if key == self.grid_key:
+            return
+        geometry_changed = self.grid_key is None or self.grid_key[2:] != geometry
+        self.grid_key = key
+
+        wanted = {(row, col) for row in row_range for col in col_range}
+        created = False
+
+        for tile in list(self.tiles):
+            if tile not in wanted:
+                self.canvas.delete(self.tiles.pop(tile))
+                self._frame_calls += 1
+                if tile in self.page_texts:
+                    self.canvas.delete(self.page_texts.pop(tile))
+                    self._frame_calls += 1
+
+        for tile in wanted:
+            if tile in self.tiles and not geometry_changed:
+                continue
+
+            x1, y1, x2, y2 = self._tile_px(tile[0], tile[1], geometry)
+            if tile in self.tiles:
+                self.canvas.coords(self.tiles[tile], x1, y1, x2, y2)
+            else:
+                style = self.TILE_HIGHLIGHT_STYLE if tile in self.highlighted else self.TILE_STYLE
+                self.tiles[tile] = self.canvas.create_rectangle(x1, y1, x2, y2, tags='tile', **style)
+                created = True
+            self._frame_calls += 1
+
+            if tile in self.page_texts:
+                self.canvas.coords(self.page_texts[tile], x1 + 15, y1 + 15)
+                self._frame_calls += 1
+            elif tile in self.highlighted:
+                self._create_page_text(tile, x1, y1)
+                created = True
+
+        if created:
+            self._restack()
+
+    def _create_page_text(self, tile, x1, y1):
+        self.page_texts[tile] = self.canvas.create_text(
+            x1 + 15, y1 + 15, text=str(self.highlighted[tile]),
+            font=self.font_manager.get_font(14, 'bold'), fill='#0066cc', tags='page_num')
+        self._frame_calls += 1
+
+    def set_highlight(self, page_numbers):
+        """
+        Resaltar tiles con imagen. page_numbers: dict (row, col) -> número de página.
+        Solo se tocan los tiles cuyo estado u número cambió.
+        """
+        created = False
+
+        for tile in list(self.highlighted):
+            if tile not in page_numbers:
+                del self.highlighted[tile]
+                if tile in self.tiles:
+                    self.canvas.itemconfig(self.tiles[tile], **self.TILE_STYLE)
+                    self._frame_calls += 1
+                if tile in self.page_texts:
+                    self.canvas.delete(self.page_texts.pop(tile))
+                    self._frame_calls += 1
+
+        for tile, page_num in page_numbers.items():
+            previous = self.highlighted.get(tile)
+            if previous == page_num:
+                continue
+            self.highlighted[tile] = page_num
+
+            rect = self.tiles.get(tile)
+            if rect is None:
+                continue
+            if previous is None:
+                self.canvas.itemconfig(rect, **self.TILE_HIGHLIGHT_STYLE)
+                x1, y1 = self.canvas.coords(rect)[:2]
+                self._create_page_text(tile, x1, y1)
+                self._frame_calls += 2
+                created = True
+            elif tile in self.page_texts:
+                self.canvas.itemconfig(self.page_texts[tile], text=str(page_num))
+                self._frame_calls += 1
+
+        if created:
+            self._restack()
+
+    def set_image(self, photo, x, y):
+        """Mostrar la imagen; si solo cambió la posición se mueve el item existente"""
+        if self.image_item is None:
+            self.image_item = self.canvas.create_image(x, y, image=photo, anchor='nw', tags='image')
+            self.canvas.tag_raise('selection')
+            self._frame_calls += 2
+        else:
+            if photo is not self.image_photo:
+                self.canvas.itemconfig(self.image_item, image=photo)
+                self._frame_calls += 1
+            if (x, y) != self.image_pos:
+                self.canvas.coords(self.image_item, x, y)
+                self._frame_calls += 1
+        self.image_photo = photo
+        self.image_pos = (x, y)
+
+    def clear_image(self):
+        if self.image_item is not None:
+            self.canvas.delete(self.image_item)
+            self._frame_calls += 1
+        self.image_item = None
+        self.image_photo = None
+        self.image_pos = None
+
+    def set_selection(self, x1, y1, x2, y2):
+        """Mostrar/reubicar el rectángulo de selección y sus handles de esquina"""
+        coords = (x1, y1, x2, y2)
+        if coords == self.selection_coords:
+            return
+
+        hs = self.HANDLE_SIZE * 2
+        handle_boxes = {
+            'nw': (x1, y1, x1 + hs, y1 + hs),
+            'ne': (x2 - hs, y1, x2, y1 + hs),
+            'sw': (x1, y2 - hs, x1 + hs, y2),
+            'se': (x2 - hs, y2 - hs, x2, y2),
+        }
+
+        if self.selection_rect is None:
+            self.selection_rect = self.canvas.create_rectangle(
+                *coords, outline='#0066cc', width=3, dash=(5, 3), tags='selection')
+            for corner, box in handle_boxes.items():
+                self.handles[corner] = self.canvas.create_rectangle(
+                    *box, fill='#0066cc', outline='white', width=2,
+                    tags=(f'handle_{corner}', 'selection'))
+            self._frame_calls += 5
+        else:
+            if self.selection_coords is None:
+                self.canvas.itemconfig('selection', state='normal')
+                self._frame_calls += 1
+            self.canvas.coords(self.selection_rect, *coords)
+            for corner, box in handle_boxes.items():
+                self.canvas.coords(self.handles[corner], *box)
+            self._frame_calls += 5
+
+        self.selection_coords = coords
+
+    def hide_selection(self):
+        if self.selection_rect is not None and self.selection_coords is not None:
+            self.canvas.itemconfig('selection', state='hidden')
+            self._frame_calls += 1
+        self.selection_coords = None
+
+    def set_scroll_region(self, total_w, total_h):
+        region = (0, 0, total_w, total_h)
+        if region != self.scroll_region:
+            self.canvas.configure(scrollregion=region)
+            self.scroll_region = region
+            self._frame_calls += 1
+
+    def end_frame(self, started):
+        """Cerrar un frame: registrar tiempo (ms) y llamadas Tk realizadas"""
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        stats = self.stats
+        stats['frames'] += 1
+        stats['last_ms'] = elapsed_ms
+        stats['avg_ms'] += (elapsed_ms - stats['avg_ms']) / stats['frames']
+        stats['last_tk_calls'] = self._frame_calls
+        stats['tk_calls'] += self._frame_calls
+        self._frame_calls = 0